@@ -1,11 +1,28 @@
+# pandas, plotly, numpy and streamlit_option_menu are imported where they are
+# first used, so a cold start only loads what the page being shown needs. Check
+# the cost with `python benchmarks/startup.py`.
 import streamlit as st
-import pandas as pd
-import numpy as np
 import base64
 import json
-from streamlit_option_menu import option_menu
-import plotly.graph_objects as go
-import plotly.express as px
+import math
+import os
+import secrets
+import time
+from collections import OrderedDict
+from fractions import Fraction
+from converter import (UNIT_DEFINITIONS, UNIT_REGISTRY, cached_convert_exact, conversion_cache, convert,
+                       convert_exact, convert_file, convert_to_all, exact_decimal, resolve_unit)
+from favorites import SessionFavorites
+from metrics import metrics, set_enabled
+from store import DB_PATH, PROFILE_MAX_AGE, FavoritesStore, HistoryStore
+from theme import THEME_CSS, THEME_ICONS, themes
+
+# Directory the Batch page may read input files from and write output files to;
+# paths typed on the page are taken relative to it
+BATCH_DIR = os.path.realpath(os.environ.get("UNIT_CONVERTER_DATA_DIR", "data"))
+
+# Start of this rerun, for the rerun_seconds metric
+rerun_started = time.perf_counter()
 
 # Set page configuration
 st.set_page_config(
@@ -15,448 +32,267 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Define color themes with more vibrant colors
-themes = {
-    "light": {
-        "primary": "#4361EE",
-        "secondary": "#F5F5F5",
-        "text": "#333333",
-        "accent": "#F72585",
-        "background": "#FFFFFF",
-        "card": "#F9F9F9",
-        "success": "#4CAF50",
-        "info": "#3A86FF",
-        "warning": "#FFBE0B",
-        "danger": "#FF006E"
-    },
-    "dark": {
-        "primary": "#4CC9F0",
-        "secondary": "#1E1E1E",
-        "text": "#E1E1E1",
-        "accent": "#F72585",
-        "background": "#121212",
-        "card": "#1F1F1F",
-        "success": "#4CAF50",
-        "info": "#3A86FF",
-        "warning": "#FFBE0B",
-        "danger": "#FF006E"
-    }
-}
+# History and favorites live in the shared SQLite file unless persistence is
+# turned off, in which case they are kept in session memory
+def open_history(profile):
+    if DB_PATH:
+        return HistoryStore(DB_PATH, profile)
+    
+    from history import HISTORY_CAPACITY, HistoryBuffer
+    return HistoryBuffer(HISTORY_CAPACITY)
+
+def open_favorites(profile):
+    return FavoritesStore(DB_PATH, profile) if DB_PATH else SessionFavorites()
 
 # Initialize session state
 if 'theme' not in st.session_state:
     st.session_state.theme = "light"
+# Every session starts on its own random profile key, so history and favorites
+# stay private unless the key is shared or typed in again on a later visit
+if 'profile' not in st.session_state:
+    st.session_state.profile = secrets.token_urlsafe(16)
 if 'history' not in st.session_state:
-    st.session_state.history = []
+    st.session_state.history = open_history(st.session_state.profile)
 if 'favorites' not in st.session_state:
-    st.session_state.favorites = []
+    st.session_state.favorites = open_favorites(st.session_state.profile)
 if 'navigation_selection' not in st.session_state:
     st.session_state.navigation_selection = None
+if 'decimal_places' not in st.session_state:
+    st.session_state.decimal_places = 8
+if 'exact_mode' not in st.session_state:
+    st.session_state.exact_mode = False
+if 'chart_mode' not in st.session_state:
+    st.session_state.chart_mode = "Plotly"
+if 'figures' not in st.session_state:
+    st.session_state.figures = OrderedDict()
+if 'extra_units' not in st.session_state:
+    st.session_state.extra_units = {}
 
 # Apply custom CSS based on theme
+@metrics.timed("theme_seconds")
 def apply_theme(theme_name):
-    theme = themes[theme_name]
-    
-    css = f"""
-    <style>
-        :root {{
-            --primary: {theme["primary"]};
-            --secondary: {theme["secondary"]};
-            --text: {theme["text"]};
-            --accent: {theme["accent"]};
-            --background: {theme["background"]};
-            --card: {theme["card"]};
-        }}
-        
-        .stApp {{
-            background-color: var(--background);
-            color: var(--text);
-        }}
-        
-        .stButton>button {{
-            background-color: var(--primary);
-            color: white;
-            border-radius: 8px;
-            border: none;
-            padding: 0.5rem 1rem;
-            transition: all 0.3s ease;
-        }}
-        
-        .stButton>button:hover {{
-            background-color: var(--accent);
-            transform: translateY(-2px);
-            box-shadow: 0 4px 8px rgba(0,0,0,0.1);
-        }}
-        
-        .card {{
-            background-color: var(--card);
-            border-radius: 10px;
-            padding: 1.5rem;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.05);
-            margin-bottom: 1rem;
-            border: 1px solid rgba(0,0,0,0.05);
-        }}
-        
-        .icon-text {{
-            display: flex;
-            align-items: center;
-            gap: 0.5rem;
-        }}
-        
-        .result-card {{
-            background-color: var(--primary);
-            color: white;
-            border-radius: 10px;
-            padding: 1rem;
-            text-align: center;
-            font-size: 1.5rem;
-            margin: 1rem 0;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.1);
-        }}
-        
-        .sidebar .sidebar-content {{
-            background-color: var(--secondary);
-        }}
-        
-        h1, h2, h3 {{
-            color: var(--primary);
-        }}
-        
-        .stSelectbox label, .stNumberInput label {{
-            color: var(--text);
-        }}
-        
-        .theme-toggle {{
-            position: fixed;
-            top: 1rem;
-            right: 1rem;
-            z-index: 1000;
-        }}
-        
-        /* Responsive adjustments */
-        @media (max-width: 768px) {{
-            .card {{
-                padding: 1rem;
-            }}
-            
-            .result-card {{
-                font-size: 1.2rem;
-            }}
-        }}
-    </style>
-    """
-    
-    st.markdown(css, unsafe_allow_html=True)
+    st.markdown(THEME_CSS[theme_name], unsafe_allow_html=True)
 
 # Apply the current theme
 apply_theme(st.session_state.theme)
 
-# Colorful SVG icons with dynamic color based on theme
+# Colorful SVG icons with dynamic color based on theme (prebuilt in theme.py)
 def get_colored_icon(icon_name):
-    theme_colors = themes[st.session_state.theme]
-    
-    # Define colors for different icon types
-    icon_colors = {
-        "length": theme_colors["primary"],
-        "weight": theme_colors["accent"],
-        "temperature": theme_colors["danger"],
-        "volume": theme_colors["info"],
-        "area": theme_colors["success"],
-        "time": theme_colors["warning"],
-        "speed": theme_colors["primary"],
-        "pressure": theme_colors["info"],
-        "energy": theme_colors["danger"],
-        "data": theme_colors["success"],
-        "history": theme_colors["warning"],
-        "favorites": theme_colors["accent"],
-        "settings": theme_colors["primary"],
-        "theme": theme_colors["info"]
-    }
-    
-    color = icon_colors.get(icon_name, theme_colors["primary"])
-    
-    icons = {
-        "length": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M2 12h20M2 12V6M22 12V6"/></svg>""",
-        "weight": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="8"/><line x1="12" y1="8" x2="12" y2="12"/><line x1="12" y1="16" x2="12" y2="16"/></svg>""",
-        "temperature": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M14 14.76V3.5a2.5 2.5 0 0 0-5 0v11.26a4.5 4.5 0 1 0 5 0z"/></svg>""",
-        "volume": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M2 9l10-5 10 5v6l-10 5-10-5V9z"/><path d="M12 14v4"/><path d="M2 9l10 5 10-5"/></svg>""",
-        "area": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"/></svg>""",
-        "time": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"/><polyline points="12 6 12 12 16 14"/></svg>""",
-        "speed": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M19 5L5 19"/><circle cx="6.5" cy="6.5" r="2.5"/><circle cx="17.5" cy="17.5" r="2.5"/></svg>""",
-        "pressure": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M12 2v20M2 12h20"/><path d="M12 22a10 10 0 0 0 0-20"/></svg>""",
-        "energy": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M13 2L3 14h9l-1 8 10-12h-9l1-8z"/></svg>""",
-        "data": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="2" y="2" width="20" height="8" rx="2" ry="2"/><rect x="2" y="14" width="20" height="8" rx="2" ry="2"/><line x1="6" y1="6" x2="6" y2="6"/><line x1="6" y1="18" x2="6" y2="18"/></svg>""",
-        "history": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M3 3v18h18"/><path d="M19 9l-5 5-4-4-3 3"/></svg>""",
-        "favorites": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="{color}" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M19 21l-7-5-7 5V5a2 2 0 0 1 2-2h10a2 2 0 0 1 2 2z"/></svg>""",
-        "settings": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="3"/><path d="M19.4 15a1.65 1.65 0 0 0 .33 1.82l.06.06a2 2 0 0 1 0 2.83 2 2 0 0 1-2.83 0l-.06-.06a1.65 1.65 0 0 0-1.82-.33 1.65 1.65 0 0 0-1 1.51V21a2 2 0 0 1-2 2 2 2 0 0 1-2-2v-.09A1.65 1.65 0 0 0 9 19.4a1.65 1.65 0 0 0-1.82.33l-.06.06a2 2 0 0 1-2.83 0 2 2 0 0 1 0-2.83l.06-.06a1.65 1.65 0 0 0 .33-1.82 1.65 1.65 0 0 0-1.51-1H3a2 2 0 0 1-2-2 2 2 0 0 1 2-2h.09A1.65 1.65 0 0 0 4.6 9a1.65 1.65 0 0 0-.33-1.82l-.06-.06a2 2 0 0 1 0-2.83 2 2 0 0 1 2.83 0l.06.06a1.65 1.65 0 0 0 1.82.33H9a1.65 1.65 0 0 0 1-1.51V3a2 2 0 0 1 2-2 2 2 0 0 1 2 2v.09a1.65 1.65 0 0 0 1 1.51 1.65 1.65 0 0 0 1.82-.33l.06-.06a2 2 0 0 1 2.83 0 2 2 0 0 1 0 2.83l-.06.06a1.65 1.65 0 0 0-.33 1.82V9a1.65 1.65 0 0 0 1.51 1H21a2 2 0 0 1 2 2 2 2 0 0 1-2 2h-.09a1.65 1.65 0 0 0-1.51 1z"/></svg>""",
-        "theme": f"""<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="{color}" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z"/></svg>""",
-    }
-    
-    return base64.b64encode(icons[icon_name].encode()).decode()
+    return THEME_ICONS[st.session_state.theme][icon_name]
 
 # Function to create icons with text
 def icon_text(icon, text):
     return f'<div class="icon-text"><img src="data:image/svg+xml;base64,{icon}" width="24" height="24"/> {text}</div>'
 
-# Conversion functions
-def length_conversion(value, from_unit, to_unit):
-    # Base unit: meters
-    conversion_factors = {
-        "Millimeters": 0.001,
-        "Centimeters": 0.01,
-        "Meters": 1.0,
-        "Kilometers": 1000.0,
-        "Inches": 0.0254,
-        "Feet": 0.3048,
-        "Yards": 0.9144,
-        "Miles": 1609.34
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def weight_conversion(value, from_unit, to_unit):
-    # Base unit: grams
-    conversion_factors = {
-        "Milligrams": 0.001,
-        "Grams": 1.0,
-        "Kilograms": 1000.0,
-        "Metric Tons": 1000000.0,
-        "Ounces": 28.3495,
-        "Pounds": 453.592,
-        "Stone": 6350.29,
-        "US Tons": 907185.0
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def temperature_conversion(value, from_unit, to_unit):
-    # Special case for temperature
-    if from_unit == "Celsius" and to_unit == "Fahrenheit":
-        return (value * 9/5) + 32
-    elif from_unit == "Celsius" and to_unit == "Kelvin":
-        return value + 273.15
-    elif from_unit == "Fahrenheit" and to_unit == "Celsius":
-        return (value - 32) * 5/9
-    elif from_unit == "Fahrenheit" and to_unit == "Kelvin":
-        return ((value - 32) * 5/9) + 273.15
-    elif from_unit == "Kelvin" and to_unit == "Celsius":
-        return value - 273.15
-    elif from_unit == "Kelvin" and to_unit == "Fahrenheit":
-        return ((value - 273.15) * 9/5) + 32
-    else:
-        return value  # Same unit
-
-def volume_conversion(value, from_unit, to_unit):
-    # Base unit: liters
-    conversion_factors = {
-        "Milliliters": 0.001,
-        "Liters": 1.0,
-        "Cubic Meters": 1000.0,
-        "US Fluid Ounces": 0.0295735,
-        "US Cups": 0.236588,
-        "US Pints": 0.473176,
-        "US Quarts": 0.946353,
-        "US Gallons": 3.78541,
-        "Imperial Fluid Ounces": 0.0284131,
-        "Imperial Cups": 0.284131,
-        "Imperial Pints": 0.568261,
-        "Imperial Quarts": 1.13652,
-        "Imperial Gallons": 4.54609
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def area_conversion(value, from_unit, to_unit):
-    # Base unit: square meters
-    conversion_factors = {
-        "Square Millimeters": 0.000001,
-        "Square Centimeters": 0.0001,
-        "Square Meters": 1.0,
-        "Square Kilometers": 1000000.0,
-        "Square Inches": 0.00064516,
-        "Square Feet": 0.092903,
-        "Square Yards": 0.836127,
-        "Acres": 4046.86,
-        "Square Miles": 2589988.11,
-        "Hectares": 10000.0
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def time_conversion(value, from_unit, to_unit):
-    # Base unit: seconds
-    conversion_factors = {
-        "Nanoseconds": 1e-9,
-        "Microseconds": 1e-6,
-        "Milliseconds": 0.001,
-        "Seconds": 1.0,
-        "Minutes": 60.0,
-        "Hours": 3600.0,
-        "Days": 86400.0,
-        "Weeks": 604800.0,
-        "Months (avg)": 2629746.0,
-        "Years (avg)": 31556952.0
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def speed_conversion(value, from_unit, to_unit):
-    # Base unit: meters per second
-    conversion_factors = {
-        "Meters per second": 1.0,
-        "Kilometers per hour": 0.277778,
-        "Miles per hour": 0.44704,
-        "Feet per second": 0.3048,
-        "Knots": 0.514444
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def pressure_conversion(value, from_unit, to_unit):
-    # Base unit: pascals
-    conversion_factors = {
-        "Pascals": 1.0,
-        "Kilopascals": 1000.0,
-        "Megapascals": 1000000.0,
-        "Bars": 100000.0,
-        "Atmospheres": 101325.0,
-        "Millimeters of Mercury": 133.322,
-        "Inches of Mercury": 3386.39,
-        "Pounds per Square Inch": 6894.76
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def energy_conversion(value, from_unit, to_unit):
-    # Base unit: joules
-    conversion_factors = {
-        "Joules": 1.0,
-        "Kilojoules": 1000.0,
-        "Calories": 4.184,
-        "Kilocalories": 4184.0,
-        "Watt-hours": 3600.0,
-        "Kilowatt-hours": 3600000.0,
-        "Electron-volts": 1.602176634e-19,
-        "British Thermal Units": 1055.06,
-        "US Therms": 105506000.0,
-        "Foot-pounds": 1.35582
-    }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
-
-def data_conversion(value, from_unit, to_unit):
-    # Base unit: bytes
-    conversion_factors = {
-        "Bits": 0.125,
-        "Bytes": 1.0,
-        "Kilobits": 128.0,
-        "Kilobytes": 1024.0,
-        "Megabits": 131072.0,
-        "Megabytes": 1048576.0,
-        "Gigabits": 134217728.0,
-        "Gigabytes": 1073741824.0,
-        "Terabits": 137438953472.0,
-        "Terabytes": 1099511627776.0,
-        "Petabits": 140737488355328.0,
-        "Petabytes": 1125899906842624.0
+# Category pages: everything main() needs to render one conversion page.
+# "units" are the category's defined units (a copy: prefixed units the converter
+# generates on demand are added per session, see page_units); "to_index" is the
+# default To unit, "chart" picks the visualization and "formula" is the expander text.
+CATEGORIES = {
+    "Length": {
+        "units": list(UNIT_DEFINITIONS["Length"]["factors"]),
+        "to_index": 2,
+        "default_value": 1.0,
+        "chart": "bar",
+        "icon": "rulers",
+        "formula": [
+            "Length conversion is based on the meter as the base unit.",
+            "1 meter = 1000 millimeters = 100 centimeters = 0.001 kilometers",
+            "1 meter = 39.3701 inches = 3.28084 feet = 1.09361 yards = 0.000621371 miles"
+        ]
+    },
+    "Weight": {
+        "units": list(UNIT_DEFINITIONS["Weight"]["factors"]),
+        "to_index": 2,
+        "default_value": 1.0,
+        "chart": "bar",
+        "icon": "weight",
+        "formula": [
+            "Weight conversion is based on the gram as the base unit.",
+            "1 kilogram = 1000 grams = 1,000,000 milligrams = 0.001 metric tons",
+            "1 kilogram = 35.274 ounces = 2.20462 pounds = 0.157473 stone = 0.00110231 US tons"
+        ]
+    },
+    "Temperature": {
+        "units": list(UNIT_DEFINITIONS["Temperature"]["factors"]),
+        "to_index": 1,
+        "default_value": 0.0,
+        "chart": "gauge",
+        "icon": "thermometer",
+        "formula": [
+            "Temperature conversion formulas:",
+            "Celsius to Fahrenheit: °F = (°C × 9/5) + 32",
+            "Celsius to Kelvin: K = °C + 273.15",
+            "Fahrenheit to Celsius: °C = (°F - 32) × 5/9",
+            "Fahrenheit to Kelvin: K = (°F - 32) × 5/9 + 273.15",
+            "Kelvin to Celsius: °C = K - 273.15",
+            "Kelvin to Fahrenheit: °F = (K - 273.15) × 9/5 + 32",
+            "Rankine to Kelvin: K = °R × 5/9",
+            "Réaumur to Celsius: °C = °Ré × 5/4"
+        ]
+    },
+    "Volume": {
+        "units": list(UNIT_DEFINITIONS["Volume"]["factors"]),
+        "to_index": 1,
+        "default_value": 1.0,
+        "chart": "log_bar",
+        "icon": "droplet",
+        "formula": [
+            "Volume conversion is based on the liter as the base unit.",
+            "1 liter = 1000 milliliters = 0.001 cubic meters",
+            "1 liter = 33.814 US fluid ounces = 4.22675 US cups = 2.11338 US pints = 1.05669 US quarts = 0.264172 US gallons",
+            "1 liter = 35.1951 Imperial fluid ounces = 3.51951 Imperial cups = 1.75975 Imperial pints = 0.879877 Imperial quarts = 0.219969 Imperial gallons"
+        ]
+    },
+    "Area": {
+        "units": list(UNIT_DEFINITIONS["Area"]["factors"]),
+        "to_index": 2,
+        "default_value": 1.0,
+        "chart": "log_bar",
+        "icon": "square",
+        "formula": [
+            "Area conversion is based on the square meter as the base unit.",
+            "1 square meter = 1,000,000 square millimeters = 10,000 square centimeters = 0.000001 square kilometers",
+            "1 square meter = 1550 square inches = 10.7639 square feet = 1.19599 square yards = 0.000247105 acres = 3.86102e-7 square miles = 0.0001 hectares"
+        ]
+    },
+    "Time": {
+        "units": list(UNIT_DEFINITIONS["Time"]["factors"]),
+        "to_index": 3,
+        "default_value": 1.0,
+        "chart": "log_bar",
+        "icon": "clock",
+        "formula": [
+            "Time conversion is based on the second as the base unit.",
+            "1 second = 1,000,000,000 nanoseconds = 1,000,000 microseconds = 1,000 milliseconds",
+            "1 minute = 60 seconds",
+            "1 hour = 60 minutes = 3,600 seconds",
+            "1 day = 24 hours = 1,440 minutes = 86,400 seconds",
+            "1 week = 7 days = 168 hours = 10,080 minutes = 604,800 seconds",
+            "1 month (average) = 30.44 days = 730.5 hours = 43,830 minutes = 2,629,746 seconds",
+            "1 year (average) = 365.24 days = 8,765.76 hours = 525,946 minutes = 31,556,952 seconds"
+        ]
+    },
+    "Speed": {
+        "units": list(UNIT_DEFINITIONS["Speed"]["factors"]),
+        "to_index": 1,
+        "default_value": 1.0,
+        "chart": "log_bar",
+        "icon": "speedometer",
+        "formula": [
+            "Speed conversion is based on meters per second as the base unit.",
+            "1 meter per second = 3.6 kilometers per hour = 2.23694 miles per hour = 3.28084 feet per second = 1.94384 knots"
+        ]
+    },
+    "Pressure": {
+        "units": list(UNIT_DEFINITIONS["Pressure"]["factors"]),
+        "to_index": 4,
+        "default_value": 1.0,
+        "chart": "log_bar",
+        "icon": "gauge",
+        "formula": [
+            "Pressure conversion is based on the pascal as the base unit.",
+            "1 bar = 100,000 pascals = 100 kilopascals = 0.1 megapascals",
+            "1 atmosphere = 101,325 pascals = 101.325 kilopascals = 0.101325 megapascals = 1.01325 bars",
+            "1 atmosphere = 760 millimeters of mercury = 29.9213 inches of mercury = 14.6959 pounds per square inch",
+            "Gauge pressure is measured relative to the atmosphere: absolute = gauge + 101,325 pascals"
+        ]
+    },
+    "Energy": {
+        "units": list(UNIT_DEFINITIONS["Energy"]["factors"]),
+        "to_index": 2,
+        "default_value": 1.0,
+        "chart": "log_bar",
+        "icon": "lightning",
+        "formula": [
+            "Energy conversion is based on the joule as the base unit.",
+            "1 kilojoule = 1,000 joules",
+            "1 calorie = 4.184 joules",
+            "1 kilocalorie = 4,184 joules = 4.184 kilojoules",
+            "1 watt-hour = 3,600 joules = 3.6 kilojoules",
+            "1 kilowatt-hour = 3,600,000 joules = 3,600 kilojoules = 860.421 kilocalories",
+            "1 British thermal unit = 1,055.06 joules = 1.05506 kilojoules = 0.252164 kilocalories"
+        ]
+    },
+    "Data": {
+        "units": list(UNIT_DEFINITIONS["Data"]["factors"]),
+        "to_index": 3,
+        "default_value": 1.0,
+        "chart": "log_bar",
+        "icon": "hdd",
+        "formula": [
+            "Data conversion is based on the byte as the base unit.",
+            "1 byte = 8 bits",
+            "Kilo, mega, giga, ... are decimal (SI) prefixes:",
+            "1 kilobyte (kB) = 1,000 bytes = 8,000 bits",
+            "1 megabyte (MB) = 1,000,000 bytes = 1,000 kilobytes",
+            "1 gigabyte (GB) = 1,000,000,000 bytes = 1,000 megabytes",
+            "Kibi, mebi, gibi, ... are binary (IEC) prefixes:",
+            "1 kibibyte (KiB) = 1,024 bytes = 8,192 bits",
+            "1 mebibyte (MiB) = 1,048,576 bytes = 1,024 kibibytes",
+            "1 gibibyte (GiB) = 1,073,741,824 bytes = 1,024 mebibytes ≈ 1.074 gigabytes",
+            "Larger prefixes (exabytes, zebibytes, ...) are available in search and quick convert"
+        ]
     }
-    
-    # Convert to base unit
-    base_value = value * conversion_factors[from_unit]
-    
-    # Convert from base unit to target unit
-    result = base_value / conversion_factors[to_unit]
-    
-    return result
+}
+
+# Rows shown per page on the History and Favorites pages
+HISTORY_PAGE_SIZE = 100
+FAVORITES_PAGE_SIZE = 25
+
+# Pages after the category pages in the navigation menu, with their icons
+OTHER_PAGES = {
+    "Batch": "file-earmark-spreadsheet",
+    "History": "clock-history",
+    "Favorites": "star",
+    "Settings": "gear"
+}
+
+# Units offered on a category's pages: the defined units plus the prefixed units
+# this session opened from a search or a favorite. The converter generates those
+# for the whole process, but other sessions only see the ones they asked for.
+def page_units(category):
+    return CATEGORIES[category]["units"] + st.session_state.extra_units.get(category, [])
+
+# Add a unit to this session's dropdowns for its category and return it
+def open_unit(category, unit):
+    extra = st.session_state.extra_units.setdefault(category, [])
+    if unit not in CATEGORIES[category]["units"] and unit not in extra:
+        extra.append(unit)
+    return unit
 
 # Function to add conversion to history
 def add_to_history(category, value, from_unit, to_unit, result):
-    st.session_state.history.append({
-        "timestamp": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "category": category,
-        "value": value,
-        "from_unit": from_unit,
-        "to_unit": to_unit,
-        "result": result
-    })
-    
-    # Keep only the last 50 conversions
-    if len(st.session_state.history) > 50:
-        st.session_state.history = st.session_state.history[-50:]
+    st.session_state.history.append(category, value, from_unit, to_unit, result)
 
-# Function to add conversion to favorites - FIXED
+# Function to add conversion to favorites
 def add_to_favorites(category, value, from_unit, to_unit, result):
-    favorite = {
-        "category": category,
-        "value": value,
-        "from_unit": from_unit,
-        "to_unit": to_unit,
-        "result": result
-    }
-    
-    # Check if already in favorites
-    if not any(f["category"] == favorite["category"] and 
-               f["from_unit"] == favorite["from_unit"] and 
-               f["to_unit"] == favorite["to_unit"] and 
-               f["value"] == favorite["value"] for f in st.session_state.favorites):
-        st.session_state.favorites.append(favorite)
-        return True
-    return False
+    return st.session_state.favorites.add(category, value, from_unit, to_unit, result)
 
 # Function to remove from favorites
-def remove_from_favorites(index):
-    if 0 <= index < len(st.session_state.favorites):
-        st.session_state.favorites.pop(index)
-        return True
-    return False
+def remove_from_favorites(favorite_id):
+    return st.session_state.favorites.remove(favorite_id)
+
+# One imported favorite as a (category, value, from_unit, to_unit, result) tuple:
+# a known category, units resolved to canonical names and finite numbers.
+# Raises KeyError, TypeError or ValueError for anything else.
+def import_favorite(favorite):
+    if not isinstance(favorite, dict):
+        raise ValueError(f"invalid favorite {favorite!r}")
+    category = favorite["category"]
+    if category not in CATEGORIES:
+        raise ValueError(f"unknown category {category!r}")
+    
+    numbers = []
+    for field in ("value", "result"):
+        number = favorite[field]
+        if isinstance(number, bool) or not isinstance(number, (int, float)) or not math.isfinite(number):
+            raise ValueError(f"favorite {field} must be a finite number, got {number!r}")
+        numbers.append(float(number))
+    
+    from_unit = resolve_unit(category, str(favorite["from_unit"]))
+    to_unit = resolve_unit(category, str(favorite["to_unit"]))
+    return category, numbers[0], from_unit, to_unit, numbers[1]
 
 # Function to create a card with content
 def create_card(title, content):
@@ -467,72 +303,184 @@ def create_card(title, content):
     </div>
     """, unsafe_allow_html=True)
 
+# Resolve a Batch page path inside BATCH_DIR, raising ValueError for paths that
+# leave it, missing input files and output files that already exist
+def batch_path(name, output=False):
+    path = os.path.realpath(os.path.join(BATCH_DIR, name))
+    if os.path.commonpath([path, BATCH_DIR]) != BATCH_DIR or path == BATCH_DIR:
+        raise ValueError(f"{name} is outside the data directory")
+    if output and os.path.exists(path):
+        raise ValueError(f"{name} already exists")
+    if not output and not os.path.isfile(path):
+        raise ValueError(f"{name} not found in the data directory")
+    return path
+
 # Function to display the result
 def display_result(value, from_unit, to_unit, result):
     st.markdown(f"""
     <div class="result-card">
-        {value} {from_unit} = {result:.8g} {to_unit}
+        {value} {from_unit} = {format_result(result)} {to_unit}
     </div>
     """, unsafe_allow_html=True)
 
-# Function to create a visualization for the conversion
-def create_visualization(category, value, from_unit, to_unit, result):
-    if category == "Length":
-        fig = px.bar(
-            x=[from_unit, to_unit],
-            y=[value, result],
-            labels={"x": "Unit", "y": "Value"},
-            title=f"Length Conversion: {value} {from_unit} to {to_unit}",
-            color_discrete_sequence=[themes[st.session_state.theme]["primary"], themes[st.session_state.theme]["accent"]]
-        )
-        return fig
+# Hit rate, size and eviction counters of the process-wide exact result cache;
+# returns the stats
+def show_cache_stats():
+    st.caption(
+        "Exact mode results are cached per (category, value, from unit, to unit) and shared by all "
+        "sessions. Fast mode converts directly and does not use the cache."
+    )
+    cache_stats = conversion_cache.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hit Rate", f"{cache_stats['hit_rate']:.1%}")
+    col2.metric("Entries", f"{cache_stats['size']:,} / {cache_stats['maxsize']:,}")
+    col3.metric("Hits / Misses", f"{cache_stats['hits']:,} / {cache_stats['misses']:,}")
+    col4.metric("Evictions", f"{cache_stats['evictions']:,}")
+    return cache_stats
+
+# Largest precision the Settings slider offers
+MAX_DECIMAL_PLACES = 20
+
+# Format a result with the precision chosen in Settings: exact results are rounded
+# to that many decimal places, floats to that many significant digits
+def format_result(result):
+    places = st.session_state.decimal_places
+    if isinstance(result, Fraction):
+        return f"{exact_decimal(result, places):f}"
+    return f"{result:.{max(places, 1)}g}"
+
+# Largest number of values in a fan-out sweep
+SWEEP_LIMIT = 100_000
+
+# Values for a fan-out sweep: "1, 2, 5" or "start:stop:step" (stop included when
+# it falls on the grid)
+def parse_sweep(text):
+    import numpy as np
+    
+    if ":" in text:
+        parts = [float(part) for part in text.split(":")]
+        if len(parts) != 3 or parts[2] == 0:
+            raise ValueError("expected start:stop:step with a non-zero step")
+        if not all(math.isfinite(part) for part in parts):
+            raise ValueError("start, stop and step must be finite numbers")
+        start, stop, step = parts
+        steps = (stop - start) / step
+        if not math.isfinite(steps):
+            raise ValueError(f"at most {SWEEP_LIMIT:,} values")
+        count = math.floor(steps + 1e-9) + 1
+        if count > SWEEP_LIMIT:
+            raise ValueError(f"at most {SWEEP_LIMIT:,} values")
+        values = start + step * np.arange(max(count, 0))
+    else:
+        values = np.array([float(part) for part in text.split(",") if part.strip()])
     
-    elif category == "Weight":
-        fig = px.bar(
-            x=[from_unit, to_unit],
-            y=[value, result],
-            labels={"x": "Unit", "y": "Value"},
-            title=f"Weight Conversion: {value} {from_unit} to {to_unit}",
-            color_discrete_sequence=[themes[st.session_state.theme]["primary"], themes[st.session_state.theme]["accent"]]
+    if len(values) == 0:
+        raise ValueError("no values")
+    if len(values) > SWEEP_LIMIT:
+        raise ValueError(f"at most {SWEEP_LIMIT:,} values")
+    return values
+
+# Chart rendering modes offered on the Settings page
+CHART_MODES = ["Plotly", "Lightweight", "Off"]
+
+# Plotly figures kept per session, one per (category, unit pair, theme)
+FIGURE_CACHE_SIZE = 32
+
+# Function to render the chart for a conversion in the selected mode
+def render_visualization(category, value, from_unit, to_unit, result):
+    if st.session_state.chart_mode == "Off":
+        return
+    
+    if st.session_state.chart_mode == "Lightweight":
+        st.markdown(lightweight_chart(value, from_unit, to_unit, result), unsafe_allow_html=True)
+        return
+    
+    fig = create_visualization(category, value, from_unit, to_unit, result)
+    if fig:
+        st.plotly_chart(fig, use_container_width=True)
+
+# Two plain HTML bars for a value and its result: no chart library, no figure JSON
+@metrics.timed("chart_seconds", mode="lightweight")
+def lightweight_chart(value, from_unit, to_unit, result):
+    theme = themes[st.session_state.theme]
+    magnitudes = [abs(value), abs(result)]
+    
+    # Use log scale for large differences
+    if min(magnitudes) > 0 and max(magnitudes) / min(magnitudes) > 1000:
+        magnitudes = [math.log10(1 + m) for m in magnitudes]
+    largest = max(magnitudes) or 1
+    
+    rows = "".join(
+        f'<div style="display:flex;align-items:center;gap:0.5rem;margin:0.25rem 0">'
+        f'<span style="width:30%;text-align:right">{unit}</span>'
+        f'<div style="flex:1"><div style="width:{max(m / largest * 100, 1):.1f}%;height:1.2rem;'
+        f'border-radius:4px;background-color:{color}"></div></div>'
+        f'<span style="width:20%">{format_result(number)}</span></div>'
+        for unit, number, m, color in zip(
+            [from_unit, to_unit], [value, result], magnitudes, [theme["primary"], theme["accent"]]
         )
-        return fig
+    )
+    return f'<div class="card">{rows}</div>'
+
+# Function to create a visualization for the conversion. The figure for each
+# (category, unit pair, theme) is built once per session; later conversions only
+# update its values and title.
+@metrics.timed("chart_seconds", mode="plotly")
+def create_visualization(category, value, from_unit, to_unit, result):
+    chart = CATEGORIES[category]["chart"] if category in CATEGORIES else None
+    if chart is None:
+        return None
+    
+    theme = themes[st.session_state.theme]
+    figures = st.session_state.figures
+    key = (category, from_unit, to_unit, st.session_state.theme)
+    fig = figures.get(key)
+    if fig is None:
+        fig = figures[key] = base_figure(chart, theme)
+        if len(figures) > FIGURE_CACHE_SIZE:
+            figures.popitem(last=False)
+    figures.move_to_end(key)
     
-    elif category == "Temperature":
+    if chart == "gauge":
         # For temperature, use a gauge chart
-        fig = go.Figure(go.Indicator(
-            mode="gauge+number",
+        fig.update_traces(
             value=result,
-            title={"text": f"Temperature: {value} {from_unit} to {to_unit}"},
+            title={"text": f"{category}: {value} {from_unit} to {to_unit}"},
             gauge={
                 "axis": {"range": [None, max(value, result) * 1.2]},
-                "bar": {"color": themes[st.session_state.theme]["primary"]},
-                "steps": [
-                    {"range": [0, result], "color": themes[st.session_state.theme]["accent"]}
-                ]
+                "steps": [{"range": [0, result], "color": theme["accent"]}]
             }
-        ))
-        return fig
-    
-    elif category in ["Volume", "Area", "Time", "Speed", "Pressure", "Energy", "Data"]:
-        # For other categories, use a simple comparison chart
-        fig = px.bar(
-            x=[from_unit, to_unit],
-            y=[value, result],
-            labels={"x": "Unit", "y": "Value"},
-            title=f"{category} Conversion: {value} {from_unit} to {to_unit}",
-            color_discrete_sequence=[themes[st.session_state.theme]["primary"], themes[st.session_state.theme]["accent"]]
         )
-        
-        # Use log scale for large differences
-        if max(value, result) / min(value, result) > 1000:
-            fig.update_layout(yaxis_type="log")
-            
         return fig
     
-    return None
+    # Simple comparison chart
+    fig.update_traces(x=[from_unit, to_unit], y=[value, result])
+    fig.update_layout(title_text=f"{category} Conversion: {value} {from_unit} to {to_unit}")
+    
+    # Use log scale for large differences
+    use_log = chart == "log_bar" and min(value, result) > 0 and max(value, result) / min(value, result) > 1000
+    fig.update_layout(yaxis_type="log" if use_log else "linear")
+    return fig
+
+# The parts of a chart that don't change between conversions
+def base_figure(chart, theme):
+    import plotly.graph_objects as go
+    
+    if chart == "gauge":
+        return go.Figure(go.Indicator(
+            mode="gauge+number",
+            gauge={"bar": {"color": theme["primary"]}}
+        ))
+    
+    return go.Figure(
+        go.Bar(marker_color=theme["primary"]),
+        layout={"xaxis_title": "Unit", "yaxis_title": "Value"}
+    )
 
 # Main app
 def main():
+    from streamlit_option_menu import option_menu
+    
     # Sidebar
     with st.sidebar:
         st.title("Unit Converter")
@@ -549,16 +497,8 @@ def main():
         # Navigation with colorful icons
         selected = option_menu(
             "Navigation",
-            [
-                "Length", "Weight", "Temperature", "Volume", 
-                "Area", "Time", "Speed", "Pressure", 
-                "Energy", "Data", "History", "Favorites", "Settings"
-            ],
-            icons=[
-                "rulers", "weight", "thermometer", "droplet", 
-                "square", "clock", "speedometer", "gauge", 
-                "lightning", "hdd", "clock-history", "star", "gear"
-            ],
+            [*CATEGORIES, *OTHER_PAGES],
+            icons=[page["icon"] for page in CATEGORIES.values()] + list(OTHER_PAGES.values()),
             menu_icon="convert",
             default_index=0,
             styles={
@@ -571,9 +511,46 @@ def main():
         if st.session_state.navigation_selection is not None:
             selected = st.session_state.navigation_selection
             st.session_state.navigation_selection = None
+        
+        # Unit search across every category; a result opens its category page
+        # with that unit selected
+        query = st.text_input("Search units", placeholder="kilometers, psi, °F...", key="unit_search")
+        if query.strip():
+            from search import search
+            
+            matches = search(query, limit=6)
+            if not matches:
+                st.caption("No matching units")
+            for match in matches:
+                if st.button(f"{match.unit} · {match.category}", key=f"search_{match.category}_{match.unit}"):
+                    st.session_state[f"from_{match.category.lower()}"] = open_unit(match.category, match.unit)
+                    st.session_state.navigation_selection = match.category
+                    st.rerun()
+        
+        # Quick convert: a free-text request such as "3.2 mi to km" or "90 km/h -> m/s"
+        quick = st.text_input("Quick convert", placeholder="3.2 mi to km", key="quick_convert")
+        if quick.strip():
+            from expressions import compile_request
+            
+            try:
+                quick_value, plan = compile_request(quick)
+                if st.session_state.exact_mode:
+                    quick_result = plan.convert_exact(quick_value)
+                else:
+                    quick_result = plan.convert(float(quick_value))
+                st.success(f"{quick_value} {plan.source} = {format_result(quick_result)} {plan.target}")
+            except (KeyError, ValueError, OverflowError) as e:
+                st.error(e.args[0] if e.args else str(e))
+    
+    # Hidden diagnostics page, opened with ?diagnostics in the URL
+    if "diagnostics" in st.query_params:
+        selected = "Diagnostics"
     
     # Main content
-    if selected in ["Length", "Weight", "Temperature", "Volume", "Area", "Time", "Speed", "Pressure", "Energy", "Data"]:
+    if selected in CATEGORIES:
+        page = CATEGORIES[selected]
+        units = page_units(selected)
+        key = selected.lower()
         st.title(f"{selected} Conversion")
         
         # Input section
@@ -582,194 +559,133 @@ def main():
         with col1:
             st.markdown(f"<h3>From</h3>", unsafe_allow_html=True)
             
-            # Different units based on the selected category
-            if selected == "Length":
-                units = ["Millimeters", "Centimeters", "Meters", "Kilometers", "Inches", "Feet", "Yards", "Miles"]
-                from_unit = st.selectbox("From Unit", units, key="from_length")
-                value = st.number_input("Value", value=1.0, key="value_length")
-            
-            elif selected == "Weight":
-                units = ["Milligrams", "Grams", "Kilograms", "Metric Tons", "Ounces", "Pounds", "Stone", "US Tons"]
-                from_unit = st.selectbox("From Unit", units, key="from_weight")
-                value = st.number_input("Value", value=1.0, key="value_weight")
-            
-            elif selected == "Temperature":
-                units = ["Celsius", "Fahrenheit", "Kelvin"]
-                from_unit = st.selectbox("From Unit", units, key="from_temp")
-                value = st.number_input("Value", value=0.0, key="value_temp")
-            
-            elif selected == "Volume":
-                units = ["Milliliters", "Liters", "Cubic Meters", "US Fluid Ounces", "US Cups", "US Pints", "US Quarts", "US Gallons", "Imperial Fluid Ounces", "Imperial Cups", "Imperial Pints", "Imperial Quarts", "Imperial Gallons"]
-                from_unit = st.selectbox("From Unit", units, key="from_volume")
-                value = st.number_input("Value", value=1.0, key="value_volume")
-            
-            elif selected == "Area":
-                units = ["Square Millimeters", "Square Centimeters", "Square Meters", "Square Kilometers", "Square Inches", "Square Feet", "Square Yards", "Acres", "Square Miles", "Hectares"]
-                from_unit = st.selectbox("From Unit", units, key="from_area")
-                value = st.number_input("Value", value=1.0, key="value_area")
-            
-            elif selected == "Time":
-                units = ["Nanoseconds", "Microseconds", "Milliseconds", "Seconds", "Minutes", "Hours", "Days", "Weeks", "Months (avg)", "Years (avg)"]
-                from_unit = st.selectbox("From Unit", units, key="from_time")
-                value = st.number_input("Value", value=1.0, key="value_time")
-            
-            elif selected == "Speed":
-                units = ["Meters per second", "Kilometers per hour", "Miles per hour", "Feet per second", "Knots"]
-                from_unit = st.selectbox("From Unit", units, key="from_speed")
-                value = st.number_input("Value", value=1.0, key="value_speed")
-            
-            elif selected == "Pressure":
-                units = ["Pascals", "Kilopascals", "Megapascals", "Bars", "Atmospheres", "Millimeters of Mercury", "Inches of Mercury", "Pounds per Square Inch"]
-                from_unit = st.selectbox("From Unit", units, key="from_pressure")
-                value = st.number_input("Value", value=1.0, key="value_pressure")
-            
-            elif selected == "Energy":
-                units = ["Joules", "Kilojoules", "Calories", "Kilocalories", "Watt-hours", "Kilowatt-hours", "Electron-volts", "British Thermal Units", "US Therms", "Foot-pounds"]
-                from_unit = st.selectbox("From Unit", units, key="from_energy")
-                value = st.number_input("Value", value=1.0, key="value_energy")
-            
-            elif selected == "Data":
-                units = ["Bits", "Bytes", "Kilobits", "Kilobytes", "Megabits", "Megabytes", "Gigabits", "Gigabytes", "Terabits", "Terabytes", "Petabits", "Petabytes"]
-                from_unit = st.selectbox("From Unit", units, key="from_data")
-                value = st.number_input("Value", value=1.0, key="value_data")
+            from_unit = st.selectbox("From Unit", units, key=f"from_{key}")
+            value = st.number_input("Value", value=page["default_value"], key=f"value_{key}")
         
         with col2:
             st.markdown(f"<h3>To</h3>", unsafe_allow_html=True)
-            
-            # Different units based on the selected category
-            if selected == "Length":
-                to_unit = st.selectbox("To Unit", units, index=2, key="to_length")
-            elif selected == "Weight":
-                to_unit = st.selectbox("To Unit", units, index=2, key="to_weight")
-            elif selected == "Temperature":
-                to_unit = st.selectbox("To Unit", units, index=1, key="to_temp")
-            elif selected == "Volume":
-                to_unit = st.selectbox("To Unit", units, index=1, key="to_volume")
-            elif selected == "Area":
-                to_unit = st.selectbox("To Unit", units, index=2, key="to_area")
-            elif selected == "Time":
-                to_unit = st.selectbox("To Unit", units, index=3, key="to_time")
-            elif selected == "Speed":
-                to_unit = st.selectbox("To Unit", units, index=1, key="to_speed")
-            elif selected == "Pressure":
-                to_unit = st.selectbox("To Unit", units, index=4, key="to_pressure")
-            elif selected == "Energy":
-                to_unit = st.selectbox("To Unit", units, index=2, key="to_energy")
-            elif selected == "Data":
-                to_unit = st.selectbox("To Unit", units, index=3, key="to_data")
+            to_unit = st.selectbox("To Unit", units, index=page["to_index"], key=f"to_{key}")
         
         # Convert button
-        if st.button("Convert", key=f"convert_{selected.lower()}"):
-            # Perform conversion based on the selected category
-            if selected == "Length":
-                result = length_conversion(value, from_unit, to_unit)
-            elif selected == "Weight":
-                result = weight_conversion(value, from_unit, to_unit)
-            elif selected == "Temperature":
-                result = temperature_conversion(value, from_unit, to_unit)
-            elif selected == "Volume":
-                result = volume_conversion(value, from_unit, to_unit)
-            elif selected == "Area":
-                result = area_conversion(value, from_unit, to_unit)
-            elif selected == "Time":
-                result = time_conversion(value, from_unit, to_unit)
-            elif selected == "Speed":
-                result = speed_conversion(value, from_unit, to_unit)
-            elif selected == "Pressure":
-                result = pressure_conversion(value, from_unit, to_unit)
-            elif selected == "Energy":
-                result = energy_conversion(value, from_unit, to_unit)
-            elif selected == "Data":
-                result = data_conversion(value, from_unit, to_unit)
-            
-            # Display result
-            display_result(value, from_unit, to_unit, result)
+        if st.button("Convert", key=f"convert_{key}"):
+            # Perform conversion exactly (through the shared result cache), or in float64
+            if st.session_state.exact_mode:
+                exact = cached_convert_exact(selected, value, from_unit, to_unit)
+                try:
+                    result = float(exact)
+                except OverflowError:
+                    # Past float64, as the fast path's inf; the exact result is still shown
+                    result = math.inf if exact > 0 else -math.inf
+            else:
+                exact = None
+                result = convert(selected, value, from_unit, to_unit)
+            metrics.increment("conversions_total", category=selected)
             
             # Add to history
             add_to_history(selected, value, from_unit, to_unit, result)
             
+            # Keep the result so it survives the rerun triggered by the favorites button
+            st.session_state[f"last_{key}"] = (value, from_unit, to_unit, result, exact)
+        
+        # Show the last conversion while its inputs are unchanged
+        last_conversion = st.session_state.get(f"last_{key}")
+        if last_conversion is not None and last_conversion[:3] == (value, from_unit, to_unit):
+            result, exact = last_conversion[3:]
+            
+            # Display result
+            display_result(value, from_unit, to_unit, result if exact is None else exact)
+            
             # Create visualization
-            fig = create_visualization(selected, value, from_unit, to_unit, result)
-            if fig:
-                st.plotly_chart(fig, use_container_width=True)
+            render_visualization(selected, value, from_unit, to_unit, result)
             
-            # Add to favorites button - FIXED
+            # Add to favorites button, or a note if it is already saved (O(1) key lookup)
             col1, col2 = st.columns([1, 1])
             with col1:
-                if st.button("Add to Favorites", key=f"add_fav_{selected.lower()}"):
+                if st.session_state.favorites.contains(selected, value, from_unit, to_unit):
+                    st.info("This conversion is in your favorites.")
+                elif st.button("Add to Favorites", key=f"add_fav_{key}"):
                     if add_to_favorites(selected, value, from_unit, to_unit, result):
                         st.success("Added to favorites!")
                     else:
                         st.info("This conversion is already in your favorites!")
         
+        # Fan-out: the input in every unit of the category from one vectorized pass,
+        # instead of a Convert press (and rerun) per target unit
+        if st.toggle("Show in every unit", key=f"fanout_{key}"):
+            if st.session_state.exact_mode:
+                results = [convert_exact(selected, value, from_unit, unit) for unit in units]
+            else:
+                results = convert_to_all(selected, value, from_unit, units).tolist()
+            st.dataframe(
+                [{"Unit": unit, "Value": format_result(r)} for unit, r in zip(units, results)],
+                hide_index=True, use_container_width=True
+            )
+            
+            # Sweep: many input values against every unit as one array operation
+            sweep = st.text_input(
+                f"Sweep values ({from_unit})",
+                key=f"sweep_{key}",
+                placeholder="e.g. 1, 2, 5, 10 or 0:100:10 (start:stop:step)"
+            )
+            if sweep.strip():
+                try:
+                    sweep_values = parse_sweep(sweep)
+                except ValueError as e:
+                    st.error(f"Invalid sweep: {e}")
+                else:
+                    import pandas as pd
+                    
+                    matrix = convert_to_all(selected, sweep_values, from_unit, units)
+                    st.dataframe(
+                        pd.DataFrame(matrix, index=pd.Index(sweep_values, name=from_unit), columns=units),
+                        use_container_width=True
+                    )
+                    st.caption(f"{len(sweep_values):,} values × {len(units)} units, computed in float64.")
+        
         # Formula explanation
         with st.expander("Formula Explanation"):
-            if selected == "Length":
-                st.write("Length conversion is based on the meter as the base unit.")
-                st.write("1 meter = 1000 millimeters = 100 centimeters = 0.001 kilometers")
-                st.write("1 meter = 39.3701 inches = 3.28084 feet = 1.09361 yards = 0.000621371 miles")
-            
-            elif selected == "Weight":
-                st.write("Weight conversion is based on the gram as the base unit.")
-                st.write("1 kilogram = 1000 grams = 1,000,000 milligrams = 0.001 metric tons")
-                st.write("1 kilogram = 35.274 ounces = 2.20462 pounds = 0.157473 stone = 0.00110231 US tons")
-            
-            elif selected == "Temperature":
-                st.write("Temperature conversion formulas:")
-                st.write("Celsius to Fahrenheit: °F = (°C × 9/5) + 32")
-                st.write("Celsius to Kelvin: K = °C + 273.15")
-                st.write("Fahrenheit to Celsius: °C = (°F - 32) × 5/9")
-                st.write("Fahrenheit to Kelvin: K = (°F - 32) × 5/9 + 273.15")
-                st.write("Kelvin to Celsius: °C = K - 273.15")
-                st.write("Kelvin to Fahrenheit: °F = (K - 273.15) × 9/5 + 32")
-            
-            elif selected == "Volume":
-                st.write("Volume conversion is based on the liter as the base unit.")
-                st.write("1 liter = 1000 milliliters = 0.001 cubic meters")
-                st.write("1 liter = 33.814 US fluid ounces = 4.22675 US cups = 2.11338 US pints = 1.05669 US quarts = 0.264172 US gallons")
-                st.write("1 liter = 35.1951 Imperial fluid ounces = 3.51951 Imperial cups = 1.75975 Imperial pints = 0.879877 Imperial quarts = 0.219969 Imperial gallons")
-            
-            elif selected == "Area":
-                st.write("Area conversion is based on the square meter as the base unit.")
-                st.write("1 square meter = 1,000,000 square millimeters = 10,000 square centimeters = 0.000001 square kilometers")
-                st.write("1 square meter = 1550 square inches = 10.7639 square feet = 1.19599 square yards = 0.000247105 acres = 3.86102e-7 square miles = 0.0001 hectares")
-            
-            elif selected == "Time":
-                st.write("Time conversion is based on the second as the base unit.")
-                st.write("1 second = 1,000,000,000 nanoseconds = 1,000,000 microseconds = 1,000 milliseconds")
-                st.write("1 minute = 60 seconds")
-                st.write("1 hour = 60 minutes = 3,600 seconds")
-                st.write("1 day = 24 hours = 1,440 minutes = 86,400 seconds")
-                st.write("1 week = 7 days = 168 hours = 10,080 minutes = 604,800 seconds")
-                st.write("1 month (average) = 30.44 days = 730.5 hours = 43,830 minutes = 2,629,746 seconds")
-                st.write("1 year (average) = 365.24 days = 8,765.76 hours = 525,946 minutes = 31,556,952 seconds")
-            
-            elif selected == "Speed":
-                st.write("Speed conversion is based on meters per second as the base unit.")
-                st.write("1 meter per second = 3.6 kilometers per hour = 2.23694 miles per hour = 3.28084 feet per second = 1.94384 knots")
-            
-            elif selected == "Pressure":
-                st.write("Pressure conversion is based on the pascal as the base unit.")
-                st.write("1 bar = 100,000 pascals = 100 kilopascals = 0.1 megapascals")
-                st.write("1 atmosphere = 101,325 pascals = 101.325 kilopascals = 0.101325 megapascals = 1.01325 bars")
-                st.write("1 atmosphere = 760 millimeters of mercury = 29.9213 inches of mercury = 14.6959 pounds per square inch")
-            
-            elif selected == "Energy":
-                st.write("Energy conversion is based on the joule as the base unit.")
-                st.write("1 kilojoule = 1,000 joules")
-                st.write("1 calorie = 4.184 joules")
-                st.write("1 kilocalorie = 4,184 joules = 4.184 kilojoules")
-                st.write("1 watt-hour = 3,600 joules = 3.6 kilojoules")
-                st.write("1 kilowatt-hour = 3,600,000 joules = 3,600 kilojoules = 860.421 kilocalories")
-                st.write("1 British thermal unit = 1,055.06 joules = 1.05506 kilojoules = 0.252164 kilocalories")
-            
-            elif selected == "Data":
-                st.write("Data conversion is based on the byte as the base unit.")
-                st.write("1 byte = 8 bits")
-                st.write("1 kilobyte = 1,024 bytes = 8,192 bits")
-                st.write("1 megabyte = 1,048,576 bytes = 8,388,608 bits = 1,024 kilobytes")
-                st.write("1 gigabyte = 1,073,741,824 bytes = 8,589,934,592 bits = 1,048,576 kilobytes = 1,024 megabytes")
-                st.write("1 terabyte = 1,099,511,627,776 bytes = 8,796,093,022,208 bits = 1,073,741,824 kilobytes = 1,048,576 megabytes = 1,024 gigabytes")
+            for line in page["formula"]:
+                st.write(line)
+    
+    # Batch page: stream a whole CSV/Parquet file through the vectorized converter
+    elif selected == "Batch":
+        st.title("Batch File Conversion")
+        st.write("Convert one column of a CSV or Parquet file on the server, chunk by chunk. "
+                 f"Paths are relative to the data directory ({BATCH_DIR}); existing files are never overwritten.")
+        
+        categories = list(UNIT_REGISTRY)
+        category = st.selectbox("Category", categories, key="batch_category")
+        units = page_units(category)
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            input_path = st.text_input("Input file path", key="batch_input")
+            column = st.text_input("Column to convert", key="batch_column")
+            from_unit = st.selectbox("From Unit", units, key="batch_from")
+        with col2:
+            output_path = st.text_input("Output file path", key="batch_output")
+            output_column = st.text_input("Output column (leave empty to overwrite)", key="batch_output_column")
+            to_unit = st.selectbox("To Unit", units, index=min(1, len(units) - 1), key="batch_to")
+        
+        chunksize = st.number_input("Rows per chunk", min_value=1000, value=100_000, step=10_000, key="batch_chunksize")
+        
+        if st.button("Convert File", key="convert_batch"):
+            if not input_path or not output_path or not column:
+                st.error("Please fill in the input path, output path and column.")
+            else:
+                status = st.empty()
+                try:
+                    rows = convert_file(
+                        batch_path(input_path), batch_path(output_path, output=True),
+                        column, category, from_unit, to_unit,
+                        output_column=output_column or None,
+                        chunksize=int(chunksize),
+                        progress=lambda done: status.write(f"Converted {done:,} rows...")
+                    )
+                    status.empty()
+                    st.success(f"Converted {rows:,} rows from {from_unit} to {to_unit} into {output_path}")
+                except Exception as e:
+                    st.error(f"Error converting file: {e}")
     
     # History page
     elif selected == "History":
@@ -778,25 +694,40 @@ def main():
         if not st.session_state.history:
             st.info("No conversion history yet. Try converting some units first!")
         else:
-            # Create a DataFrame from the history
-            history_df = pd.DataFrame(st.session_state.history)
+            history = st.session_state.history
+            
+            # Only the visible page is read from the history backend
+            col1, col2 = st.columns(2)
+            with col1:
+                category_filter = st.selectbox("Category", ["All", *CATEGORIES], key="history_category")
+            category_filter = None if category_filter == "All" else category_filter
+            total = history.count(category_filter)
+            pages = max(1, -(-total // HISTORY_PAGE_SIZE))
+            with col2:
+                page_number = st.number_input("Page", min_value=1, max_value=pages, value=1, key="history_page")
+            
+            history_df = history.page((page_number - 1) * HISTORY_PAGE_SIZE, HISTORY_PAGE_SIZE, category_filter)
             
             # Display the history
             st.dataframe(history_df, use_container_width=True)
+            kept = f" of up to {history.capacity:,}" if history.capacity else ""
+            st.caption(f"Page {page_number} of {pages} · {total:,}{kept} conversions, newest first. Times are in UTC.")
             
             # Clear history button
             if st.button("Clear History"):
-                st.session_state.history = []
+                history.clear()
                 st.success("History cleared!")
                 st.rerun()
             
-            # Visualize history
-            if len(st.session_state.history) > 1:
+            # Visualize history from the backend's running aggregates
+            if len(history) > 1:
+                import pandas as pd
+                import plotly.express as px
+                
                 st.subheader("Conversion Categories")
                 
                 # Count the categories
-                category_counts = history_df["category"].value_counts().reset_index()
-                category_counts.columns = ["Category", "Count"]
+                category_counts = pd.DataFrame(list(history.category_counts().items()), columns=["Category", "Count"])
                 
                 # Create a pie chart
                 fig = px.pie(
@@ -807,45 +738,108 @@ def main():
                     color_discrete_sequence=px.colors.qualitative.Pastel
                 )
                 st.plotly_chart(fig, use_container_width=True)
+                
+                # Most used unit pairs
+                st.subheader("Most Used Conversions")
+                top_pairs = pd.DataFrame(history.top_pairs(10), columns=["Category", "From", "To", "Count"])
+                st.dataframe(top_pairs, hide_index=True, use_container_width=True)
+                
+                # Conversions over time, from the hourly buckets
+                st.subheader("Conversions Over Time")
+                bucket = st.radio("Bucket", ["Hour", "Day"], horizontal=True, key="history_bucket")
+                trend = pd.DataFrame(history.hourly_counts(), columns=["Time", "Conversions"])
+                trend["Time"] = pd.to_datetime(trend["Time"], unit="s")
+                if bucket == "Day":
+                    trend = trend.groupby(trend["Time"].dt.floor("D"), as_index=False)["Conversions"].sum()
+                fig = px.bar(
+                    trend,
+                    x="Time",
+                    y="Conversions",
+                    title=f"Conversions per {bucket.lower()} (UTC)",
+                    color_discrete_sequence=[themes[st.session_state.theme]["primary"]]
+                )
+                st.plotly_chart(fig, use_container_width=True)
     
-    # Favorites page - FIXED
+    # Favorites page: one table widget for the visible page instead of a row of
+    # widgets per favorite, with search and bulk actions on the selected rows
     elif selected == "Favorites":
         st.title("Favorite Conversions")
+        favorites = st.session_state.favorites
         
-        if not st.session_state.favorites:
+        if not favorites:
             st.info("No favorite conversions yet. Add some from the conversion pages!")
         else:
-            # Display each favorite conversion
-            for i, favorite in enumerate(st.session_state.favorites):
-                col1, col2, col3 = st.columns([3, 1, 1])
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                query = st.text_input("Search favorites", placeholder="Category or unit, e.g. feet").strip() or None
+            with col2:
+                category_filter = st.selectbox("Category", ["All", *CATEGORIES], key="favorites_category")
+            category_filter = None if category_filter == "All" else category_filter
+            
+            # Only the visible page of matching favorites is read from the backend
+            total = favorites.count(query, category_filter)
+            pages = max(1, -(-total // FAVORITES_PAGE_SIZE))
+            page_number = st.number_input("Page", min_value=1, max_value=pages, value=1, key="favorites_page")
+            page_favorites = favorites.items((page_number - 1) * FAVORITES_PAGE_SIZE, FAVORITES_PAGE_SIZE,
+                                             query, category_filter)
+            st.caption(f"Page {page_number} of {pages} · {total:,} of {len(favorites):,} favorites")
+            
+            if page_favorites:
+                import pandas as pd
                 
-                with col1:
-                    st.write(f"**{favorite['category']}**: {favorite['value']} {favorite['from_unit']} = {favorite['result']:.8g} {favorite['to_unit']}")
+                table = pd.DataFrame({
+                    "Select": False,
+                    "Category": [f["category"] for f in page_favorites],
+                    "Value": [f["value"] for f in page_favorites],
+                    "From": [f["from_unit"] for f in page_favorites],
+                    "Result": [format_result(f["result"]) for f in page_favorites],
+                    "To": [f["to_unit"] for f in page_favorites]
+                })
+                edited = st.data_editor(
+                    table,
+                    hide_index=True,
+                    use_container_width=True,
+                    disabled=["Category", "Value", "From", "Result", "To"],
+                    column_config={"Select": st.column_config.CheckboxColumn("Select")},
+                    key=f"favorites_table_{page_number}_{query}_{category_filter}"
+                )
+                chosen = [page_favorites[i] for i in edited.index[edited["Select"]]]
                 
-                with col2:
-                    # Use this favorite button
-                    if st.button("Use", key=f"use_fav_{i}"):
-                        # Set session state variables for the conversion page
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    # Open the first selected favorite on its conversion page
+                    if st.button("Use Selected", disabled=not chosen):
+                        favorite = chosen[0]
                         category = favorite['category'].lower()
-                        st.session_state[f"from_{category}"] = favorite['from_unit']
-                        st.session_state[f"to_{category}"] = favorite['to_unit']
+                        # Prefixed units saved in an earlier run may not be generated yet
+                        st.session_state[f"from_{category}"] = open_unit(
+                            favorite['category'], resolve_unit(favorite['category'], favorite['from_unit']))
+                        st.session_state[f"to_{category}"] = open_unit(
+                            favorite['category'], resolve_unit(favorite['category'], favorite['to_unit']))
                         st.session_state[f"value_{category}"] = favorite['value']
-                        # Navigate to the appropriate conversion page
                         st.session_state.navigation_selection = favorite['category']
                         st.rerun()
                 
-                with col3:
-                    # Remove from favorites button
-                    if st.button("Remove", key=f"remove_fav_{i}"):
-                        if remove_from_favorites(i):
-                            st.success("Removed from favorites!")
-                            st.rerun()
+                with col2:
+                    if st.button("Remove Selected", disabled=not chosen):
+                        removed = sum(remove_from_favorites(favorite['id']) for favorite in chosen)
+                        st.success(f"Removed {removed} favorite(s)!")
+                        st.rerun()
                 
-                st.markdown("---")
+                with col3:
+                    st.download_button(
+                        "Export Selected",
+                        json.dumps([{k: v for k, v in f.items() if k != "id"} for f in chosen]),
+                        file_name="unit_converter_favorites.json",
+                        mime="application/json",
+                        disabled=not chosen
+                    )
+            else:
+                st.info("No favorites match your search.")
             
             # Clear all favorites button
             if st.button("Clear All Favorites"):
-                st.session_state.favorites = []
+                favorites.clear()
                 st.success("All favorites cleared!")
                 st.rerun()
     
@@ -868,9 +862,72 @@ def main():
             st.session_state.theme = "dark"
             st.rerun()
         
-        # Decimal places
-        st.subheader("Decimal Places")
-        decimal_places = st.slider("Number of decimal places to display", 0, 10, 8)
+        # Charts
+        st.subheader("Charts")
+        chart_mode = st.radio(
+            "Conversion chart",
+            CHART_MODES,
+            index=CHART_MODES.index(st.session_state.chart_mode),
+            horizontal=True,
+            help="Plotly draws interactive charts, Lightweight draws plain bars without a chart library, Off skips the chart."
+        )
+        if chart_mode != st.session_state.chart_mode:
+            st.session_state.chart_mode = chart_mode
+            st.rerun()
+        
+        # Conversion cache statistics; resizing and clearing it are on the Diagnostics page
+        st.subheader("Conversion Cache")
+        show_cache_stats()
+        
+        # History and favorites storage
+        st.subheader("History")
+        if DB_PATH:
+            st.caption(
+                f"History and favorites are saved to {DB_PATH} under this profile key. Keep it to "
+                "reopen them later; anyone who knows the key can see them, so avoid short or guessable keys. "
+                f"Profiles not used for {PROFILE_MAX_AGE // 86400} days are deleted."
+            )
+            profile = st.text_input("Profile key", value=st.session_state.profile).strip()
+            if profile and profile != st.session_state.profile:
+                st.session_state.profile = profile
+                st.session_state.history = open_history(profile)
+                st.session_state.favorites = open_favorites(profile)
+                st.rerun()
+        else:
+            history_capacity = st.number_input(
+                "Conversions to keep in history",
+                min_value=50,
+                max_value=10_000_000,
+                value=st.session_state.history.capacity,
+                step=10_000
+            )
+            if history_capacity != st.session_state.history.capacity:
+                st.session_state.history.resize(int(history_capacity))
+                st.rerun()
+        
+        # Arithmetic and precision
+        st.subheader("Precision")
+        exact_mode = st.radio(
+            "Arithmetic",
+            ["Fast (float64)", "Exact"],
+            index=int(st.session_state.exact_mode),
+            horizontal=True,
+            help="Exact mode converts with exact rational factors (e.g. 1 mile = 1609.344 m) and "
+                 "rounds the displayed result only once."
+        ) == "Exact"
+        if exact_mode != st.session_state.exact_mode:
+            st.session_state.exact_mode = exact_mode
+            st.rerun()
+        
+        decimal_places = st.slider(
+            "Number of decimal places to display",
+            0, MAX_DECIMAL_PLACES,
+            st.session_state.decimal_places,
+            help="Decimal places for exact results; significant digits in fast mode."
+        )
+        if decimal_places != st.session_state.decimal_places:
+            st.session_state.decimal_places = decimal_places
+            st.rerun()
         
         # Export/Import data
         st.subheader("Export/Import Data")
@@ -879,8 +936,12 @@ def main():
         if st.button("Export Settings and Favorites"):
             export_data = {
                 "theme": st.session_state.theme,
-                "favorites": st.session_state.favorites,
-                "decimal_places": decimal_places
+                "favorites": [
+                    {k: v for k, v in favorite.items() if k != "id"}
+                    for favorite in st.session_state.favorites.items()
+                ],
+                "decimal_places": decimal_places,
+                "exact_mode": exact_mode
             }
             
             # Convert to JSON
@@ -898,13 +959,28 @@ def main():
         if uploaded_file is not None:
             try:
                 import_data = json.load(uploaded_file)
+                if not isinstance(import_data, dict):
+                    raise ValueError("expected a JSON object")
+                
+                # Check the whole file before changing anything
+                if "decimal_places" in import_data:
+                    # Clamped to the slider's range, which rejects anything outside it
+                    places = min(max(int(import_data["decimal_places"]), 0), MAX_DECIMAL_PLACES)
+                favorites = None
+                if "favorites" in import_data:
+                    if not isinstance(import_data["favorites"], list):
+                        raise ValueError("favorites must be a list")
+                    favorites = [import_favorite(favorite) for favorite in import_data["favorites"]]
                 
                 # Update session state
-                if "theme" in import_data:
+                if import_data.get("theme") in themes:
                     st.session_state.theme = import_data["theme"]
-                
-                if "favorites" in import_data:
-                    st.session_state.favorites = import_data["favorites"]
+                if "decimal_places" in import_data:
+                    st.session_state.decimal_places = places
+                if "exact_mode" in import_data:
+                    st.session_state.exact_mode = bool(import_data["exact_mode"])
+                if favorites is not None:
+                    st.session_state.favorites.replace_all(favorites)
                 
                 st.success("Settings imported successfully!")
                 st.rerun()
@@ -916,7 +992,70 @@ def main():
         st.write("Professional Unit Converter App")
         st.write("Version 1.0")
         st.write("Created by FARWA KANWAL ❤ with Streamlit")
+    
+    # Diagnostics page: timings and counters collected by the metrics module
+    elif selected == "Diagnostics":
+        st.title("Diagnostics")
+        
+        enabled = st.toggle(
+            "Collect metrics",
+            value=metrics.enabled,
+            help="Applies to every session of this server process. Set UNIT_CONVERTER_METRICS=1 to collect from startup."
+        )
+        if enabled != metrics.enabled:
+            set_enabled(enabled)
+            st.rerun()
+        
+        histograms, counters = metrics.snapshot()
+        if not histograms and not counters:
+            st.info("No measurements yet." if metrics.enabled else "Metrics collection is off.")
+        
+        if histograms:
+            st.subheader("Timings (ms)")
+            st.dataframe([
+                {
+                    "Metric": h["metric"], "Labels": h["labels"], "Count": h["count"],
+                    **{column: h[field] * 1000 for column, field in
+                       [("Mean", "mean"), ("p50", "p50"), ("p90", "p90"), ("p99", "p99"), ("Max", "max")]}
+                }
+                for h in histograms
+            ], hide_index=True, use_container_width=True)
+            st.caption("Percentiles are over the most recent samples of each metric.")
+        
+        if counters:
+            st.subheader("Counters")
+            st.dataframe([
+                {"Metric": c["metric"], "Labels": c["labels"], "Value": c["value"]} for c in counters
+            ], hide_index=True, use_container_width=True)
+        
+        st.subheader("Conversion Cache")
+        cache_stats = show_cache_stats()
+        
+        cache_size = st.number_input("Cache size (entries)", min_value=0, value=cache_stats["maxsize"], step=1024)
+        if cache_size != cache_stats["maxsize"]:
+            conversion_cache.resize(int(cache_size))
+            st.rerun()
+        if st.button("Clear Cache"):
+            conversion_cache.clear()
+            st.success("Conversion cache cleared!")
+            st.rerun()
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "Export Prometheus Metrics",
+                data=metrics.prometheus(),
+                file_name="unit_converter_metrics.prom",
+                mime="text/plain"
+            )
+        with col2:
+            if st.button("Reset Metrics"):
+                metrics.reset()
+                st.rerun()
 
 # Run the app
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        metrics.observe("rerun_seconds", time.perf_counter() - rerun_started)
\ No newline at end of file
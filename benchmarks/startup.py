@@ -0,0 +1,84 @@
+# Cold-start check for the Streamlit app: runs app.py once in a fresh interpreter
+# (Streamlit "bare" mode, first page only) under `python -X importtime` and reports
+# the import time of each top-level package, slowest first.
+#
+#   python benchmarks/startup.py
+#   python benchmarks/startup.py --budget 1.5 --top 20
+#
+# Exits with status 1 when the total import time is over the budget.
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Total import time allowed for a cold start, in seconds
+STARTUP_BUDGET = 2.0
+
+# Packages the first page should not need
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "pyarrow"]
+
+DRIVER = """
+import runpy, sys
+runpy.run_path(sys.argv[1], run_name="__main__")
+print(",".join(m for m in sys.argv[2:] if m in sys.modules))
+"""
+
+# Run the app once; returns (wall seconds, importtime stderr, heavy modules loaded)
+def run_app(app=APP):
+    # A fresh database, as on a newly started container
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, UNIT_CONVERTER_DB=os.path.join(tmp, "startup.db"))
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", DRIVER, app, *HEAVY_MODULES],
+            capture_output=True, text=True, env=env, cwd=os.path.dirname(app)
+        )
+        elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr[-2000:])
+
+    loaded = process.stdout.strip().splitlines()[-1] if process.stdout.strip() else ""
+    return elapsed, process.stderr, [m for m in loaded.split(",") if m]
+
+# Cumulative import time in seconds per top-level package, from -X importtime output
+def import_times(stderr):
+    times = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit() or name.startswith("  "):
+            continue  # header line, or a nested import already counted by its parent
+        times[name.strip().split(".")[0]] += int(cumulative) / 1e6
+    return dict(times)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the import cost of an app cold start")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET,
+                        help=f"allowed total import time in seconds (default: {STARTUP_BUDGET})")
+    parser.add_argument("--top", type=int, default=15, help="packages to list (default: 15)")
+    args = parser.parse_args(argv)
+
+    elapsed, stderr, loaded = run_app()
+    times = import_times(stderr)
+    total = sum(times.values())
+
+    print(f"{'package':<32}{'seconds':>10}")
+    for name, seconds in sorted(times.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<32}{seconds:>10.3f}")
+    print(f"{'total imports':<32}{total:>10.3f}")
+    print(f"{'first run (wall)':<32}{elapsed:>10.3f}")
+    print(f"heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+    if total > args.budget:
+        print(f"over budget: {total:.3f}s > {args.budget:.3f}s", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,317 @@
+# Benchmark suite for the conversion core, history and favorites backends.
+#
+#   python benchmarks/suite.py                          # run everything, print a table
+#   python benchmarks/suite.py -o baseline.json         # ... and save the results
+#   python benchmarks/suite.py --compare baseline.json  # flag regressions against a saved run
+#   python benchmarks/suite.py --only scalar,batch --max-size 1e8
+#
+# Every result is the best of several timed repeats, reported as seconds per
+# operation and nanoseconds per element. --compare exits with status 1 when any
+# benchmark got slower than --threshold times its baseline.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+
+from converter import (CONVERTERS, UNIT_REGISTRY, ConversionCache, convert,
+                       convert_array, convert_columns, convert_exact, convert_to_all,
+                       convert_triples, resolve_pair)
+from dimensions import conversion_plan, convert_units, parse_unit
+from expressions import evaluate, evaluate_many, plan_cache
+from favorites import SessionFavorites
+from history import HistoryBuffer
+from search import build_index, search
+from store import FavoritesStore, HistoryStore
+
+GROUPS = ["scalar", "batch", "columnar", "history", "favorites"]
+
+# Time `stmt` (a callable or a statement string run against `namespace`) and
+# return the best seconds per call over `repeat` rounds
+def measure(stmt, namespace=None, repeat=3):
+    timer = timeit.Timer(stmt, globals=namespace)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+def record(group, name, seconds, n=1):
+    return {
+        "group": group,
+        "name": name,
+        "n": n,
+        "seconds": seconds,
+        "ns_per_element": seconds / n * 1e9
+    }
+
+# One call of each category's *_conversion function, with a pair of distinct units
+def bench_scalar(args):
+    results = []
+    for category, function in CONVERTERS.items():
+        units = UNIT_REGISTRY[category]["units"]
+        namespace = {"f": function, "a": units[0], "b": units[1]}
+        results.append(record("scalar", f"{category.lower()}_conversion",
+                              measure("f(1.5, a, b)", namespace)))
+
+    namespace = {"convert": convert}
+    results.append(record("scalar", "convert (dispatch)",
+                          measure("convert('Length', 1.5, 'Feet', 'Meters')", namespace)))
+
+    namespace = {"convert_exact": convert_exact}
+    results.append(record("scalar", "convert_exact Length",
+                          measure("convert_exact('Length', 1.5, 'Feet', 'Meters')", namespace)))
+    results.append(record("scalar", "convert_exact Temperature",
+                          measure("convert_exact('Temperature', 36.6, 'Celsius', 'Fahrenheit')", namespace)))
+
+    namespace = {"convert_units": convert_units}
+    results.append(record("scalar", "convert_units kWh/m² (cached plan)",
+                          measure("convert_units(1.5, 'kWh/m²', 'J/cm²')", namespace)))
+
+    def uncached():
+        parse_unit.cache_clear()
+        conversion_plan.cache_clear()
+        return convert_units(1.5, "kWh/m²", "J/cm²")
+    results.append(record("scalar", "convert_units kWh/m² (parse and compile)", measure(uncached)))
+
+    namespace = {"evaluate": evaluate}
+    results.append(record("scalar", "evaluate '3.2 mi to km' (cached plan)",
+                          measure("evaluate('3.2 mi to km')", namespace)))
+
+    def uncompiled():
+        plan_cache.clear()
+        parse_unit.cache_clear()
+        conversion_plan.cache_clear()
+        return evaluate("3.2 mi to km")
+    results.append(record("scalar", "evaluate '3.2 mi to km' (parse and compile)", measure(uncompiled)))
+
+    # Prefixed units resolve like defined ones once generated
+    namespace = {"resolve_pair": resolve_pair}
+    results.append(record("scalar", "resolve_pair defined units",
+                          measure("resolve_pair(None, 'GB', 'kB')", namespace)))
+    results.append(record("scalar", "resolve_pair prefixed units",
+                          measure("resolve_pair(None, 'EiB', 'PB')", namespace)))
+
+    namespace = {"search": search}
+    results.append(record("scalar", "search 'kilo' (trie prefix)", measure("search('kilo')", namespace)))
+    results.append(record("scalar", "search 'kilomters' (fuzzy)", measure("search('kilomters')", namespace)))
+    results.append(record("scalar", "build_index", measure(build_index)))
+
+    cache = ConversionCache()
+    cache.convert("Length", 1.5, "Feet", "Meters")
+    namespace = {"cache": cache}
+    results.append(record("scalar", "ConversionCache hit (exact)",
+                          measure("cache.convert('Length', 1.5, 'Feet', 'Meters')", namespace)))
+    return results
+
+# convert_array at growing sizes, allocating and in place, for a scaling and an
+# affine (Temperature) conversion
+def bench_batch(args):
+    results = []
+    size = 1000
+    while size <= args.max_size:
+        values = np.random.default_rng(0).random(size) * 100
+        out = np.empty_like(values)
+        repeat = 3 if size <= 10**7 else 2
+        for category, from_unit, to_unit in [("Length", "Feet", "Meters"),
+                                             ("Temperature", "Celsius", "Fahrenheit")]:
+            seconds = measure(lambda: convert_array(category, values, from_unit, to_unit), repeat=repeat)
+            results.append(record("batch", f"convert_array {category} n={size:.0e}", seconds, size))
+            seconds = measure(lambda: convert_array(category, values, from_unit, to_unit, out=out), repeat=repeat)
+            results.append(record("batch", f"convert_array {category} out= n={size:.0e}", seconds, size))
+        del values, out
+        size *= 10
+    return results
+
+# Mixed-unit columns (per-row unit codes and pandas categoricals) and mixed-category triples
+def bench_columnar(args):
+    import pandas as pd
+
+    results = []
+    rng = np.random.default_rng(0)
+    n = args.rows
+    for category in ["Length", "Temperature"]:
+        units = UNIT_REGISTRY[category]["units"]
+        values = rng.random(n) * 100
+        from_codes = rng.integers(0, len(units), n)
+        to_codes = rng.integers(0, len(units), n)
+        seconds = measure(lambda: convert_columns(category, values, from_codes, to_codes))
+        results.append(record("columnar", f"convert_columns {category} codes n={n:.0e}", seconds, n))
+
+        from_names = pd.Categorical.from_codes(from_codes, categories=units)
+        to_names = pd.Categorical.from_codes(to_codes, categories=units)
+        seconds = measure(lambda: convert_columns(category, values, from_names, to_names))
+        results.append(record("columnar", f"convert_columns {category} categorical n={n:.0e}", seconds, n))
+
+    values = rng.random(n) * 100
+    for category in ["Length", "Temperature"]:
+        from_unit = UNIT_REGISTRY[category]["units"][0]
+        cells = n * len(UNIT_REGISTRY[category]["units"])
+        seconds = measure(lambda: convert_to_all(category, values, from_unit))
+        results.append(record("columnar", f"convert_to_all {category} sweep n={n:.0e}", seconds, cells))
+
+    pairs = [(entry["units"][0], entry["units"][-1]) for entry in UNIT_REGISTRY.values()]
+    triples = [(float(i), *pairs[i % len(pairs)]) for i in range(n // 10)]
+    seconds = measure(lambda: convert_triples(triples))
+    results.append(record("columnar", f"convert_triples mixed n={len(triples):.0e}", seconds, len(triples)))
+
+    requests = ["3.2 mi to km", "90 km/h -> m/s", "-40 °C in °F", "1500 W*h to kJ"]
+    texts = [f"{i} {requests[i % len(requests)].split(' ', 1)[1]}" for i in range(n // 10)]
+    seconds = measure(lambda: evaluate_many(texts))
+    results.append(record("columnar", f"evaluate_many expressions n={len(texts):.0e}", seconds, len(texts)))
+    return results
+
+# Appending to a full history and rendering one page of it, for the in-memory
+# ring buffer and the SQLite store
+def bench_history(args):
+    results = []
+    n = args.rows
+    pairs = [(category, entry["units"][0], entry["units"][-1]) for category, entry in UNIT_REGISTRY.items()]
+
+    buffer = HistoryBuffer(n)
+    start = time.perf_counter()
+    for i in range(n):
+        category, from_unit, to_unit = pairs[i % len(pairs)]
+        buffer.append(category, 1.0, from_unit, to_unit, 2.0, timestamp=i)
+    results.append(record("history", f"HistoryBuffer append n={n:.0e}", time.perf_counter() - start, n))
+
+    results.append(record("history", "HistoryBuffer page (full)", measure(lambda: buffer.page(0, 100)), 100))
+    results.append(record("history", "HistoryBuffer page category (full)",
+                          measure(lambda: buffer.page(0, 100, "Temperature")), 100))
+    results.append(record("history", "HistoryBuffer aggregates (full)",
+                          measure(lambda: (buffer.category_counts(), buffer.top_pairs(10), buffer.hourly_counts()))))
+    results.append(record("history", f"HistoryBuffer to_frame n={n:.0e}", measure(buffer.to_frame), n))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "bench.db"), "bench")
+        rows = n // 10
+        start = time.perf_counter()
+        for i in range(rows):
+            category, from_unit, to_unit = pairs[i % len(pairs)]
+            store.append(category, 1.0, from_unit, to_unit, 2.0, timestamp=i)
+        results.append(record("history", f"HistoryStore append n={rows:.0e}", time.perf_counter() - start, rows))
+
+        results.append(record("history", "HistoryStore page", measure(lambda: store.page(0, 100)), 100))
+        results.append(record("history", "HistoryStore page category",
+                              measure(lambda: store.page(0, 100, "Temperature")), 100))
+        results.append(record("history", "HistoryStore aggregates",
+                              measure(lambda: (store.category_counts(), store.top_pairs(10), store.hourly_counts()))))
+    return results
+
+# Duplicate checks and searches against a large favorites collection
+def bench_favorites(args):
+    results = []
+    n = args.rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = [("SessionFavorites", SessionFavorites()),
+                    ("FavoritesStore", FavoritesStore(os.path.join(tmp, "bench.db"), "bench"))]
+        for name, favorites in backends:
+            start = time.perf_counter()
+            for i in range(n):
+                favorites.add("Length", float(i), "Feet", "Meters", i * 0.3048)
+            results.append(record("favorites", f"{name} add n={n:.0e}", time.perf_counter() - start, n))
+
+            middle = float(n // 2)
+            results.append(record("favorites", f"{name} contains hit",
+                                  measure(lambda: favorites.contains("Length", middle, "Feet", "Meters"))))
+            results.append(record("favorites", f"{name} contains miss",
+                                  measure(lambda: favorites.contains("Length", -1.0, "Feet", "Meters"))))
+            results.append(record("favorites", f"{name} search page",
+                                  measure(lambda: favorites.items(0, 25, query="feet")), 25))
+            results.append(record("favorites", f"{name} search count",
+                                  measure(lambda: favorites.count(query="feet"))))
+    return results
+
+BENCHMARKS = {
+    "scalar": bench_scalar,
+    "batch": bench_batch,
+    "columnar": bench_columnar,
+    "history": bench_history,
+    "favorites": bench_favorites
+}
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "processor": platform.machine()
+    }
+
+def print_results(results):
+    print(f"{'benchmark':<56}{'seconds/op':>14}{'ns/element':>14}")
+    for result in results:
+        print(f"{result['name']:<56}{result['seconds']:>14.3e}{result['ns_per_element']:>14.2f}")
+
+# Print old/new time ratios; returns the names that got slower than `threshold`
+def compare(results, baseline, threshold):
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"\n{'benchmark':<56}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for result in results:
+        old = previous.get(result["name"])
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > threshold:
+            regressions.append(result["name"])
+            flag = "  slower"
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{result['name']:<56}{old['seconds']:>12.3e}{result['seconds']:>12.3e}{ratio:>8.2f}{flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark conversions, history and favorites")
+    parser.add_argument("--only", help=f"comma-separated groups to run: {', '.join(GROUPS)}")
+    parser.add_argument("--max-size", type=float, default=1e7,
+                        help="largest batch size, a power of ten (default: 1e7; 1e8 needs ~2 GB)")
+    parser.add_argument("--rows", type=int, default=100_000,
+                        help="rows for the columnar, history and favorites benchmarks (default: 100000)")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE", help="compare against a saved JSON run")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio counted as a regression (default: 1.2)")
+    args = parser.parse_args(argv)
+    args.max_size = int(args.max_size)
+
+    groups = args.only.split(",") if args.only else GROUPS
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"unknown group(s): {', '.join(sorted(unknown))}")
+
+    results = []
+    for group in groups:
+        results += BENCHMARKS[group](args)
+    print_results(results)
+
+    run = {"meta": metadata(), "results": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:g}x", file=sys.stderr)
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
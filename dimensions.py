@@ -0,0 +1,334 @@
+# Dimensional analysis for compound unit expressions such as "km/h", "kWh/m²",
+# "MB/s" or "kg*m/s^2". Every unit is a scale to SI base units plus a vector of
+# dimension exponents; expressions are parsed into such units, checked for
+# compatible dimensions and compiled into a conversion plan that is cached, so
+# converting again with the same expressions skips parsing entirely.
+#
+#   conversion_plan("km/h", "m/s").convert(90)   -> 25.0
+#   convert_units(1, "kWh/m²", "J/cm²")          -> 360.0
+#
+# Every unit, alias and symbol of converter.UNIT_REGISTRY is available, including
+# its prefixed units ("nm", "GiB"), plus a few SI derived units that only make
+# sense in compounds (W, N, Hz, A, ...) with any SI prefix ("kW", "MHz", "mA").
+import re
+from fractions import Fraction
+from functools import lru_cache
+
+from converter import SI_PREFIXES, UNIT_REGISTRY, exact_ratio, find_unit
+
+# Base dimensions, in exponent-vector order
+DIMENSIONS = ["length", "mass", "time", "temperature", "current", "amount", "luminosity", "information"]
+
+# Exponent vector from keyword exponents, e.g. _dimension(length=1, time=-1)
+def _dimension(**exponents):
+    return tuple(exponents.get(name, 0) for name in DIMENSIONS)
+
+DIMENSIONLESS = _dimension()
+
+# Dimension and SI scale of each registry category's base unit
+CATEGORY_DIMENSIONS = {
+    "Length": (_dimension(length=1), Fraction(1)),               # meter
+    "Weight": (_dimension(mass=1), Fraction(1, 1000)),           # gram
+    "Temperature": (_dimension(temperature=1), Fraction(1)),     # kelvin
+    "Volume": (_dimension(length=3), Fraction(1, 1000)),         # liter
+    "Area": (_dimension(length=2), Fraction(1)),                 # square meter
+    "Time": (_dimension(time=1), Fraction(1)),                   # second
+    "Speed": (_dimension(length=1, time=-1), Fraction(1)),       # meter per second
+    "Pressure": (_dimension(mass=1, length=-1, time=-2), Fraction(1)),  # pascal
+    "Energy": (_dimension(mass=1, length=2, time=-2), Fraction(1)),     # joule
+    "Data": (_dimension(information=1), Fraction(1))             # byte
+}
+
+# Units beyond the registry: (dimension, SI scale) per symbol
+EXTRA_UNITS = {
+    "W": (_dimension(mass=1, length=2, time=-3), Fraction(1)),
+    "N": (_dimension(mass=1, length=1, time=-2), Fraction(1)),
+    "lbf": (_dimension(mass=1, length=1, time=-2), Fraction("4.4482216152605")),
+    "Hz": (_dimension(time=-1), Fraction(1)),
+    "A": (_dimension(current=1), Fraction(1)),
+    "V": (_dimension(mass=1, length=2, time=-3, current=-1), Fraction(1)),
+    "mol": (_dimension(amount=1), Fraction(1)),
+    "cd": (_dimension(luminosity=1), Fraction(1)),
+    "%": (DIMENSIONLESS, Fraction(1, 100))
+}
+
+# Spelled-out names of the extra units (plurals are handled by the parser)
+EXTRA_NAMES = {
+    "watt": "W",
+    "newton": "N",
+    "pound-force": "lbf",
+    "hertz": "Hz",
+    "ampere": "A", "amp": "A",
+    "volt": "V",
+    "mole": "mol",
+    "candela": "cd",
+    "percent": "%"
+}
+
+# Extra units that take SI prefixes, and the prefix factor per symbol and per name
+PREFIXABLE_EXTRAS = {"W", "N", "Hz", "A", "V", "mol", "cd"}
+PREFIX_FACTORS = {symbol: Fraction(factor) for _, symbols, factor in SI_PREFIXES for symbol in symbols}
+PREFIX_NAME_FACTORS = {name: Fraction(factor) for name, _, factor in SI_PREFIXES}
+
+class DimensionError(ValueError):
+    pass
+
+# Largest power a unit expression may raise a unit to ("m^64"), and the largest
+# exact scale, in bits, a power may produce. Exact Fraction powers grow without
+# bound, so "km^2000000" would otherwise spend seconds before failing.
+MAX_EXPONENT = 64
+MAX_SCALE_BITS = 16384
+
+# A unit: value_in_SI = value * scale + offset. Only plain temperatures carry an
+# offset; they cannot be multiplied, divided or raised to a power.
+class Unit:
+    __slots__ = ("dimension", "scale", "offset")
+
+    def __init__(self, dimension, scale, offset=Fraction(0)):
+        self.dimension = dimension
+        self.scale = scale
+        self.offset = offset
+
+    def __mul__(self, other):
+        self._check_linear(other)
+        return Unit(tuple(a + b for a, b in zip(self.dimension, other.dimension)), self.scale * other.scale)
+
+    def __truediv__(self, other):
+        self._check_linear(other)
+        return Unit(tuple(a - b for a, b in zip(self.dimension, other.dimension)), self.scale / other.scale)
+
+    def __pow__(self, exponent):
+        self._check_linear(self)
+        dimension = tuple(a * exponent for a in self.dimension)
+        bits = (self.scale.numerator.bit_length() + self.scale.denominator.bit_length()) * abs(exponent)
+        if abs(exponent) > MAX_EXPONENT or max(map(abs, dimension)) > MAX_EXPONENT or bits > MAX_SCALE_BITS:
+            raise DimensionError(f"Exponent {exponent} is too large; powers are limited to ±{MAX_EXPONENT}")
+        return Unit(dimension, self.scale ** exponent)
+
+    def _check_linear(self, other):
+        if self.offset or other.offset:
+            raise DimensionError("Offset units such as °C and °F cannot be combined; use K or °R")
+
+# Unit for a canonical registry unit
+def registry_unit(category, unit, registry=UNIT_REGISTRY):
+    dimension, base_scale = CATEGORY_DIMENSIONS[category]
+    a, b = registry[category]["exact_coefficients"][unit, registry[category]["base"]]
+    return Unit(dimension, a * base_scale, b * base_scale)
+
+# Symbol -> Unit for every registry unit and alias, plus the extra units. Prefixed
+# units are added as they are first looked up (see _lookup).
+def build_symbol_table(registry=UNIT_REGISTRY):
+    symbols = {}
+    for category, entry in registry.items():
+        for alias, unit in entry["aliases"].items():
+            symbols[alias] = registry_unit(category, unit, registry)
+
+    for symbol, (dimension, scale) in EXTRA_UNITS.items():
+        symbols.setdefault(symbol, Unit(dimension, scale))
+    for name, symbol in EXTRA_NAMES.items():
+        symbols.setdefault(name, symbols[symbol])
+    return symbols
+
+SYMBOLS = build_symbol_table()
+
+# Unit for a single name: the symbol table, then a prefixed extra unit ("kW",
+# "kilowatt"), then a prefixed registry unit ("GiB"), which the registry generates
+# on first use, and only then a case-insensitive match ("Mm" is a megameter, "MM"
+# a millimeter).
+# Returns None for unknown names.
+def _lookup(name):
+    unit = SYMBOLS.get(name)
+    if unit is not None:
+        return unit
+
+    for length in (1, 2):
+        factor = PREFIX_FACTORS.get(name[:length])
+        if factor is not None and name[length:] in PREFIXABLE_EXTRAS:
+            dimension, scale = EXTRA_UNITS[name[length:]]
+            unit = SYMBOLS[name] = Unit(dimension, scale * factor)
+            return unit
+
+    lowered = name.lower()
+    for prefix, factor in PREFIX_NAME_FACTORS.items():
+        symbol = EXTRA_NAMES.get(lowered[len(prefix):]) if lowered.startswith(prefix) else None
+        if symbol in PREFIXABLE_EXTRAS:
+            dimension, scale = EXTRA_UNITS[symbol]
+            unit = SYMBOLS[name] = Unit(dimension, scale * factor)
+            return unit
+
+    try:
+        category, canonical = find_unit(name)
+    except KeyError:
+        return SYMBOLS.get(name.lower())
+    unit = SYMBOLS[name] = registry_unit(category, canonical)
+    return unit
+
+# Trailing exponent on a unit name: "m²", "s⁻¹", "m2" or "s-1"
+SUPERSCRIPTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻", "0123456789-")
+_EXPONENT = re.compile(r"^(.*?[^\d\s⁰¹²³⁴⁵⁶⁷⁸⁹⁻-])\s*(-?\d+|[⁻]?[⁰¹²³⁴⁵⁶⁷⁸⁹]+)$")
+_TOKENS = re.compile(r"\*\*|[*·×/()^]|[^*·×/()^]+")
+
+# Parse a unit expression into a Unit. Grammar:
+#   expression := factor (("*" | "·" | "×" | "/") factor)*
+#   factor     := (name | "(" expression ")") ["^" integer | "**" integer]
+# A name is any registry unit, alias or symbol, optionally with a trailing
+# exponent ("m²", "s-1"), or a plain number; names made of several words that
+# are not a unit themselves ("kW h") are multiplied.
+@lru_cache(maxsize=1024)
+def parse_unit(expression):
+    # Registry names may contain operator characters themselves ("Months (avg)")
+    unit = _lookup(expression.strip())
+    if unit is not None:
+        return unit
+
+    tokens = [token.strip() for token in _TOKENS.findall(expression) if token.strip()]
+    if not tokens:
+        raise ValueError("Empty unit expression")
+
+    unit, position = _parse_expression(tokens, 0)
+    if position != len(tokens):
+        raise ValueError(f"Unexpected {tokens[position]!r} in unit expression {expression!r}")
+    return unit
+
+def _parse_expression(tokens, position):
+    unit, position = _parse_factor(tokens, position)
+    while position < len(tokens) and tokens[position] in ("*", "·", "×", "/"):
+        operator = tokens[position]
+        other, position = _parse_factor(tokens, position + 1)
+        unit = unit / other if operator == "/" else unit * other
+    return unit, position
+
+def _parse_factor(tokens, position):
+    if position >= len(tokens):
+        raise ValueError("Unit expression ends unexpectedly")
+
+    token = tokens[position]
+    if token == "(":
+        unit, position = _parse_expression(tokens, position + 1)
+        if position >= len(tokens) or tokens[position] != ")":
+            raise ValueError("Missing ) in unit expression")
+        position += 1
+    elif token in ("*", "·", "×", "/", ")", "^", "**"):
+        raise ValueError(f"Unexpected {token!r} in unit expression")
+    else:
+        unit = _parse_name(token)
+        position += 1
+
+    if position < len(tokens) and tokens[position] in ("^", "**"):
+        if position + 1 >= len(tokens):
+            raise ValueError("Missing exponent in unit expression")
+        try:
+            exponent = int(tokens[position + 1].translate(SUPERSCRIPTS))
+        except ValueError:
+            raise ValueError(f"Invalid exponent {tokens[position + 1]!r}")
+        unit = unit ** exponent
+        position += 2
+    return unit, position
+
+def _parse_name(name):
+    unit = _lookup(name)
+    if unit is not None:
+        return unit
+
+    # Plurals of spelled-out names: "kilometres", "watts"
+    if len(name) > 3 and name.endswith("s"):
+        unit = _lookup(name[:-1])
+        if unit is not None:
+            return unit
+
+    # Plain numbers scale the expression: "1/s", "100 km"
+    try:
+        return Unit(DIMENSIONLESS, Fraction(name))
+    except ValueError:
+        pass
+
+    match = _EXPONENT.match(name)
+    if match:
+        base = _lookup(match.group(1))
+        if base is not None:
+            return base ** int(match.group(2).translate(SUPERSCRIPTS))
+
+    words = name.split()
+    if len(words) > 1:
+        unit = _parse_name(words[0])
+        for word in words[1:]:
+            unit = unit * _parse_name(word)
+        return unit
+    raise KeyError(f"Unknown unit: {name}")
+
+# Readable form of a dimension vector, e.g. "length·time⁻¹"
+def describe(dimension):
+    parts = []
+    for name, exponent in zip(DIMENSIONS, dimension):
+        if exponent == 1:
+            parts.append(name)
+        elif exponent:
+            parts.append(name + str(exponent).translate(str.maketrans("0123456789-", "⁰¹²³⁴⁵⁶⁷⁸⁹⁻")))
+    return "·".join(parts) or "dimensionless"
+
+# Registry category whose units have this dimension, or None
+def category_of(dimension):
+    for category, (category_dimension, _) in CATEGORY_DIMENSIONS.items():
+        if category_dimension == dimension:
+            return category
+    return None
+
+# A compiled "from -> to" conversion: result = value * scale + offset, kept both
+# as float64 coefficients and exactly
+class ConversionPlan:
+    __slots__ = ("source", "target", "dimension", "scale", "offset", "exact_scale", "exact_offset")
+
+    def __init__(self, source, target, dimension, exact_scale, exact_offset):
+        self.source = source
+        self.target = target
+        self.dimension = dimension
+        self.exact_scale = exact_scale
+        self.exact_offset = exact_offset
+        try:
+            self.scale = float(exact_scale)
+            self.offset = float(exact_offset)
+        except OverflowError:
+            raise DimensionError(f"Conversion factor from {source} to {target} is out of float64 range")
+
+    def convert(self, value):
+        return value * self.scale + self.offset
+
+    # Vectorized over a NumPy array or any sequence of numbers
+    def convert_array(self, values, out=None):
+        import numpy as np
+
+        out = np.multiply(np.asarray(values, dtype=np.float64), self.scale, out=out)
+        if self.offset:
+            np.add(out, self.offset, out=out)
+        return out
+
+    # Exact result as a Fraction, see converter.convert_exact
+    def convert_exact(self, value):
+        n, d = exact_ratio(value)
+        return Fraction(n, d) * self.exact_scale + self.exact_offset
+
+    def __repr__(self):
+        return f"ConversionPlan({self.source!r} -> {self.target!r}, scale={self.scale!r}, offset={self.offset!r})"
+
+# Compile a conversion between two unit expressions, raising DimensionError when
+# their dimensions differ. Plans are cached per (source, target) pair.
+@lru_cache(maxsize=1024)
+def conversion_plan(source, target):
+    from_unit = parse_unit(source)
+    to_unit = parse_unit(target)
+    if from_unit.dimension != to_unit.dimension:
+        raise DimensionError(
+            f"Cannot convert {source} ({describe(from_unit.dimension)}) "
+            f"to {target} ({describe(to_unit.dimension)})"
+        )
+
+    # SI = value * s_from + o_from; result = (SI - o_to) / s_to
+    return ConversionPlan(
+        source, target, from_unit.dimension,
+        from_unit.scale / to_unit.scale,
+        (from_unit.offset - to_unit.offset) / to_unit.scale
+    )
+
+# Convert one value between two unit expressions
+def convert_units(value, source, target):
+    return conversion_plan(source, target).convert(value)
@@ -0,0 +1,106 @@
+# Free-text conversion requests such as "3.2 mi to km", "1500 W*h -> kJ" or
+# "-40 °C in °F". The unit part of a request is compiled once into a
+# dimensions.ConversionPlan (one factor, or an affine transform for temperatures)
+# and kept in a bounded cache keyed on the normalized unit text, so every later
+# request with the same units costs a regex match and a dict hit.
+import re
+import threading
+
+from dimensions import conversion_plan, parse_unit
+
+# Distinct unit texts kept compiled
+PLAN_CACHE_SIZE = 4096
+
+# Leading value (optional, defaults to 1) and the unit text after it
+_REQUEST = re.compile(r"^\s*(?P<value>[-+]?(?:\d[\d_]*\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)?\s*(?P<units>.*?)\s*$")
+
+# Words and arrows between the source and target units
+_SEPARATOR = re.compile(r"->|→|=>|(?<=\s)(?i:to|in|as)(?=\s)")
+
+# Compiled plans keyed on normalized unit text. A hit is a single dict lookup;
+# once full, the oldest plan is dropped to make room.
+class PlanCache:
+    def __init__(self, maxsize=PLAN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._plans)
+
+    def get(self, units):
+        plan = self._plans.get(units)
+        if plan is None:
+            plan = compile_units(units)
+            with self._lock:
+                self._plans[units] = plan
+                while len(self._plans) > max(self.maxsize, 0):
+                    del self._plans[next(iter(self._plans))]
+        return plan
+
+    def clear(self):
+        with self._lock:
+            self._plans = {}
+
+# Process-wide plan cache
+plan_cache = PlanCache()
+
+# Split a request into its value text and normalized unit text ("mi to km")
+def split_request(text):
+    match = _REQUEST.match(text)
+    units = " ".join(match.group("units").split())
+    if not units:
+        raise ValueError(f"No units in {text!r}")
+    return match.group("value") or "1", units
+
+# Compile "source <separator> target" into a conversion plan. "in" is both a
+# separator and the inch symbol, so every separator position is tried and the
+# first split whose two sides both parse wins.
+def compile_units(units):
+    error = None
+    for match in _SEPARATOR.finditer(units):
+        source = units[:match.start()].strip()
+        target = units[match.end():].strip()
+        if not source or not target:
+            continue
+        try:
+            parse_unit(source)
+            parse_unit(target)
+        except (KeyError, ValueError) as e:
+            error = error or e
+            continue
+        return conversion_plan(source, target)
+
+    if error is not None:
+        raise error
+    raise ValueError(f"Expected '<value> <unit> to <unit>', got {units!r}")
+
+# (value, plan) for a request; the value is returned as text so it can also be
+# converted exactly
+def compile_request(text):
+    value, units = split_request(text)
+    return value, plan_cache.get(units)
+
+# Evaluate one request: a float, or a Fraction with exact=True
+def evaluate(text, exact=False):
+    value, plan = compile_request(text)
+    if exact:
+        return plan.convert_exact(value)
+    return plan.convert(float(value))
+
+# Evaluate many requests: requests sharing a plan are converted in one vectorized
+# pass. Returns a float64 array in input order.
+def evaluate_many(texts):
+    import numpy as np
+
+    groups = {}
+    for row, text in enumerate(texts):
+        value, plan = compile_request(text)
+        group = groups.setdefault(id(plan), (plan, [], []))
+        group[1].append(row)
+        group[2].append(float(value))
+
+    results = np.empty(len(texts), dtype=np.float64)
+    for plan, rows, values in groups.values():
+        results[rows] = plan.convert_array(values)
+    return results
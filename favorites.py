@@ -0,0 +1,77 @@
+# Favorite conversions kept in session memory. Same interface as
+# store.FavoritesStore: add/remove/contains/items/clear/replace_all/len, each
+# favorite a dict with a stable "id".
+from itertools import islice
+
+# Canonical key of a favorite; 1 and 1.0 are the same favorite
+def favorite_key(category, value, from_unit, to_unit):
+    return f"{category}|{from_unit}|{to_unit}|{float(value)!r}"
+
+# Favorites indexed by their canonical key in an insertion-ordered dict, so add,
+# duplicate check and remove are O(1). The key doubles as the favorite's id, which
+# stays valid however the collection changes between reruns.
+class SessionFavorites:
+    def __init__(self):
+        self._favorites = {}
+
+    def __len__(self):
+        return len(self._favorites)
+
+    def contains(self, category, value, from_unit, to_unit):
+        return favorite_key(category, value, from_unit, to_unit) in self._favorites
+
+    # Add a favorite; returns False if the same conversion is already saved
+    def add(self, category, value, from_unit, to_unit, result):
+        key = favorite_key(category, value, from_unit, to_unit)
+        if key in self._favorites:
+            return False
+
+        self._favorites[key] = {
+            "id": key,
+            "category": category,
+            "value": value,
+            "from_unit": from_unit,
+            "to_unit": to_unit,
+            "result": result
+        }
+        return True
+
+    def remove(self, favorite_id):
+        return self._favorites.pop(favorite_id, None) is not None
+
+    def clear(self):
+        self._favorites = {}
+
+    # Replace every favorite with `entries` ((category, value, from_unit, to_unit,
+    # result) tuples); the new collection is built before the old one is dropped
+    def replace_all(self, entries):
+        replacement = SessionFavorites()
+        for entry in entries:
+            replacement.add(*entry)
+        self._favorites = replacement._favorites
+
+    # Number of favorites matching a search, see items()
+    def count(self, query=None, category=None):
+        if not query and category is None:
+            return len(self)
+        return sum(1 for _ in self._matching(query, category))
+
+    # Favorites in insertion order, optionally one page of those whose category or
+    # units contain `query` (case-insensitive) and/or of one category
+    def items(self, offset=0, limit=None, query=None, category=None):
+        end = None if limit is None else offset + limit
+        return [dict(favorite) for favorite in islice(self._matching(query, category), offset, end)]
+
+    def _matching(self, query, category):
+        favorites = self._favorites.values()
+        if category is not None:
+            favorites = (f for f in favorites if f["category"] == category)
+        if query:
+            query = query.lower()
+            favorites = (
+                f for f in favorites
+                if query in f["category"].lower()
+                or query in f["from_unit"].lower()
+                or query in f["to_unit"].lower()
+            )
+        return iter(favorites)
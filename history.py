@@ -0,0 +1,177 @@
+# Conversion history storage: a fixed-capacity ring buffer with typed columns
+# instead of a list of dicts. Appends are O(1) and never copy existing rows, and
+# the display DataFrame is built directly on top of the column arrays.
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from converter import UNIT_REGISTRY
+
+# Default number of rows kept per session
+HISTORY_CAPACITY = 100_000
+
+# Categories and units are stored as small integer codes. The unit list only ever
+# grows, so codes stay valid for every buffer in the process.
+CATEGORY_NAMES = list(UNIT_REGISTRY)
+CATEGORY_CODES = {name: i for i, name in enumerate(CATEGORY_NAMES)}
+UNIT_NAMES = []
+UNIT_CODES = {}
+_unit_lock = threading.Lock()
+
+def unit_code(unit):
+    code = UNIT_CODES.get(unit)
+    if code is None:
+        with _unit_lock:
+            code = UNIT_CODES.get(unit)
+            if code is None:
+                code = UNIT_CODES[unit] = len(UNIT_NAMES)
+                UNIT_NAMES.append(unit)
+    return code
+
+for _entry in UNIT_REGISTRY.values():
+    for _unit in _entry["units"]:
+        unit_code(_unit)
+
+class HistoryBuffer:
+    def __init__(self, capacity=HISTORY_CAPACITY):
+        self.capacity = capacity
+        # np.zeros memory is only committed as rows are written
+        self.timestamps = np.zeros(capacity, dtype=np.int64)  # epoch seconds, UTC
+        self.categories = np.zeros(capacity, dtype=np.int16)
+        self.from_units = np.zeros(capacity, dtype=np.int32)
+        self.to_units = np.zeros(capacity, dtype=np.int32)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.results = np.zeros(capacity, dtype=np.float64)
+        self.total = 0  # rows ever appended; the next write goes to total % capacity
+        self.stats = HistoryStats()
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def append(self, category, value, from_unit, to_unit, result, timestamp=None):
+        i = self.total % self.capacity
+        if self.total >= self.capacity:
+            # The row being overwritten leaves the aggregates
+            self.stats.remove(self.timestamps[i], self.categories[i], self.from_units[i], self.to_units[i])
+
+        self.timestamps[i] = int(time.time()) if timestamp is None else timestamp
+        self.categories[i] = CATEGORY_CODES[category]
+        self.from_units[i] = unit_code(from_unit)
+        self.to_units[i] = unit_code(to_unit)
+        self.values[i] = value
+        self.results[i] = result
+        self.total += 1
+        self.stats.add(self.timestamps[i], self.categories[i], self.from_units[i], self.to_units[i])
+
+    def clear(self):
+        self.total = 0
+        self.stats = HistoryStats()
+
+    # Change the capacity, keeping the newest rows that still fit
+    def resize(self, capacity):
+        columns = self._columns()
+        keep = min(len(self), capacity)
+        self.__init__(capacity)
+        for name, column in columns.items():
+            getattr(self, name)[:keep] = column[len(column) - keep:]
+        self.total = keep
+        for i in range(keep):
+            self.stats.add(self.timestamps[i], self.categories[i], self.from_units[i], self.to_units[i])
+
+    # Oldest-first column arrays: views into the buffer until it wraps around,
+    # after which the two halves are joined once
+    def _columns(self):
+        names = ["timestamps", "categories", "from_units", "to_units", "values", "results"]
+        n = len(self)
+        if self.total <= self.capacity:
+            return {name: getattr(self, name)[:n] for name in names}
+
+        head = self.total % self.capacity
+        return {
+            name: np.concatenate((getattr(self, name)[head:], getattr(self, name)[:head]))
+            for name in names
+        }
+
+    # DataFrame for display, oldest row first
+    def to_frame(self):
+        return _frame(self._columns())
+
+    # Number of rows, optionally only those of one category
+    def count(self, category=None):
+        if category is None:
+            return len(self)
+        return int(np.count_nonzero(self.categories[:len(self)] == CATEGORY_CODES[category]))
+
+    def category_counts(self):
+        return self.stats.category_counts()
+
+    def top_pairs(self, n=10):
+        return self.stats.top_pairs(n)
+
+    def hourly_counts(self):
+        return self.stats.hourly_counts()
+
+    # One page of rows, newest first, gathered without touching the other rows
+    def page(self, offset=0, limit=100, category=None):
+        n = len(self)
+        if category is None:
+            ages = np.arange(offset, min(offset + limit, n))
+            positions = (self.total - 1 - ages) % self.capacity
+        else:
+            positions = np.flatnonzero(self.categories[:n] == CATEGORY_CODES[category])
+            ages = (self.total - 1 - positions) % self.capacity
+            positions = positions[np.argsort(ages, kind="stable")][offset:offset + limit]
+
+        names = ["timestamps", "categories", "from_units", "to_units", "values", "results"]
+        return _frame({name: getattr(self, name)[positions] for name in names})
+
+# Running aggregates over the rows in a HistoryBuffer, updated in O(1) as rows are
+# added or overwritten, so the History page never recounts the whole buffer
+class HistoryStats:
+    def __init__(self):
+        self.categories = Counter()
+        self.pairs = Counter()
+        self.hours = Counter()
+
+    def add(self, timestamp, category, from_unit, to_unit):
+        self.categories[int(category)] += 1
+        self.pairs[int(category), int(from_unit), int(to_unit)] += 1
+        self.hours[int(timestamp) // 3600] += 1
+
+    def remove(self, timestamp, category, from_unit, to_unit):
+        for counter, key in ((self.categories, int(category)),
+                             (self.pairs, (int(category), int(from_unit), int(to_unit))),
+                             (self.hours, int(timestamp) // 3600)):
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+
+    # Rows per category name
+    def category_counts(self):
+        return {CATEGORY_NAMES[code]: count for code, count in self.categories.items()}
+
+    # Most used (category, from_unit, to_unit, count) combinations
+    def top_pairs(self, n=10):
+        return [
+            (CATEGORY_NAMES[category], UNIT_NAMES[from_unit], UNIT_NAMES[to_unit], count)
+            for (category, from_unit, to_unit), count in self.pairs.most_common(n)
+        ]
+
+    # (hour start as epoch seconds, conversions) in time order
+    def hourly_counts(self):
+        return [(hour * 3600, count) for hour, count in sorted(self.hours.items())]
+
+# Build the display DataFrame on top of the column arrays without copying them
+def _frame(columns):
+    import pandas as pd
+
+    return pd.DataFrame({
+        "timestamp": columns["timestamps"].view("datetime64[s]"),
+        "category": pd.Categorical.from_codes(columns["categories"], categories=CATEGORY_NAMES),
+        "value": columns["values"],
+        "from_unit": pd.Categorical.from_codes(columns["from_units"], categories=list(UNIT_NAMES)),
+        "to_unit": pd.Categorical.from_codes(columns["to_units"], categories=list(UNIT_NAMES)),
+        "result": columns["results"]
+    }, copy=False)
@@ -0,0 +1,184 @@
+# Optional in-process instrumentation: timing histograms and counters keyed by
+# metric name and labels, shared by every session of the app. Off unless the
+# UNIT_CONVERTER_METRICS environment variable is set (or set_enabled(True) is
+# called); while off, timers and counters return immediately and the conversion
+# functions are not wrapped at all.
+#
+# Read the numbers with snapshot() or export them with prometheus().
+import bisect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Name prefix in the Prometheus export
+PREFIX = "unit_converter_"
+
+# Help text per metric, also the list of metrics the export knows how to describe
+DESCRIPTIONS = {
+    "conversion_seconds": "Time spent in a category's conversion function",
+    "conversions_total": "Conversions requested from the app, per category",
+    "chart_seconds": "Time spent building a conversion chart",
+    "theme_seconds": "Time spent applying the theme CSS",
+    "rerun_seconds": "Duration of a full app rerun",
+    "service_requests_total": "Requests handled by the HTTP service, per path and status",
+    "service_request_seconds": "Time the HTTP service spent on a request, per path"
+}
+
+# Histogram bucket upper bounds in seconds: 1, 2.5 and 5 for every decade from 100 ns to 10 s
+BUCKETS = [m * 10.0 ** e for e in range(-7, 2) for m in (1, 2.5, 5)]
+
+# Recent samples kept per histogram for percentiles
+SAMPLE_SIZE = 2048
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.samples.append(seconds)
+
+    # Nearest-rank percentile over the recent samples
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+class MetricsRegistry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.counters = {}    # (name, labels) -> count
+        self._lock = threading.Lock()
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    # Time a block into a histogram
+    @contextmanager
+    def timer(self, name, **labels):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    # Decorator form of timer()
+    def timed(self, name, **labels):
+        def decorate(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(name, time.perf_counter() - start, **labels)
+            return wrapper
+        return decorate
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+
+    # Histogram summaries and counter values as plain rows, sorted by name and labels
+    def snapshot(self):
+        with self._lock:
+            histograms = [
+                {
+                    "metric": name,
+                    "labels": ", ".join(f"{k}={v}" for k, v in labels),
+                    "count": h.count,
+                    "mean": h.sum / h.count if h.count else 0.0,
+                    "p50": h.percentile(50),
+                    "p90": h.percentile(90),
+                    "p99": h.percentile(99),
+                    "max": h.max
+                }
+                for (name, labels), h in sorted(self.histograms.items())
+            ]
+            counters = [
+                {"metric": name, "labels": ", ".join(f"{k}={v}" for k, v in labels), "value": value}
+                for (name, labels), value in sorted(self.counters.items())
+            ]
+        return histograms, counters
+
+    # Everything in the Prometheus text exposition format
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self.histograms}):
+                lines += _header(name, "histogram")
+                for (metric, labels), h in sorted(self.histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip([*BUCKETS, "+Inf"], h.counts):
+                        cumulative += count
+                        le = bound if bound == "+Inf" else f"{bound:g}"
+                        lines.append(f"{PREFIX}{name}_bucket{_labels(labels, le=le)} {cumulative}")
+                    lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {h.sum!r}")
+                    lines.append(f"{PREFIX}{name}_count{_labels(labels)} {h.count}")
+
+            for name in sorted({name for name, _ in self.counters}):
+                lines += _header(name, "counter")
+                for (metric, labels), value in sorted(self.counters.items()):
+                    if metric == name:
+                        lines.append(f"{PREFIX}{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+def _header(name, kind):
+    return [f"# HELP {PREFIX}{name} {DESCRIPTIONS.get(name, name)}", f"# TYPE {PREFIX}{name} {kind}"]
+
+def _labels(labels, **extra):
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+# Process-wide registry
+metrics = MetricsRegistry()
+
+# Turn instrumentation on or off. While on, every entry of converter.CONVERTERS is
+# wrapped to time its calls into conversion_seconds{category=...}.
+def set_enabled(enabled):
+    from converter import CONVERTERS
+
+    metrics.enabled = enabled
+    for category, function in list(CONVERTERS.items()):
+        original = getattr(function, "__wrapped__", function)
+        CONVERTERS[category] = metrics.timed("conversion_seconds", category=category)(original) if enabled else original
+
+if os.environ.get("UNIT_CONVERTER_METRICS", "") not in ("", "0"):
+    set_enabled(True)
@@ -0,0 +1,154 @@
+# Unit search across every category: a prefix trie over unit names, symbols and
+# aliases, built once on import. Every trie node keeps the best few units below it,
+# so a lookup walks one node per character of the query and reads the ranking off
+# the last node. Queries that match no prefix fall back to a bounded edit-distance
+# walk of the same trie, so "kilomters" still finds Kilometers. Prefixed units
+# the registry generates on demand join the index once they exist, and a query
+# that names one ("GiB", "nanometres") generates it.
+#
+#   search("met")   -> [SearchMatch(unit='Meters', category='Length', ...), ...]
+import threading
+from collections import namedtuple
+
+from converter import UNIT_REGISTRY, find_unit
+
+# Units kept per trie node, also the most a search returns
+SEARCH_LIMIT = 10
+
+# Match kinds, best first; fuzzy matches add their edit distance
+EXACT, PREFIX, WORD_PREFIX, FUZZY = range(4)
+
+SearchMatch = namedtuple("SearchMatch", ["unit", "category", "text", "rank"])
+
+class TrieNode:
+    __slots__ = ("children", "entries", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []  # units whose key ends here
+        self.top = []      # best SEARCH_LIMIT units in this subtree
+
+class UnitIndex:
+    def __init__(self, limit=SEARCH_LIMIT):
+        self.limit = limit
+        self.root = TrieNode()
+        self.order = {}  # (category, unit) -> registry position, to break ties
+        self.counts = {}  # category -> units indexed so far
+        self._lock = threading.Lock()
+
+    # Index a unit under a key. Keys are matched case-insensitively; kind is
+    # PREFIX for a whole name or alias, WORD_PREFIX for a later word of a name.
+    def insert(self, key, category, unit, kind=PREFIX):
+        key = key.lower()
+        position = self.order.setdefault((category, unit), len(self.order))
+        entry = ((kind, len(key), position), key, category, unit)
+
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, TrieNode())
+            node.top = _merge(node.top, [entry], self.limit)
+        node.entries.append(entry)
+
+    # Ranked matches for a query: exact keys, then prefixes, then (only when
+    # nothing shares the prefix) keys within a small edit distance
+    def search(self, query, limit=None):
+        limit = limit or self.limit
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+
+        node = self.root
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return self.fuzzy(query, limit)
+
+        exact = [((EXACT, *entry[0][1:]), *entry[1:]) for entry in node.entries if entry[0][0] == PREFIX]
+        return [_match(entry) for entry in _merge(exact, node.top, limit)]
+
+    # Keys within max_distance edits of the query (1, or 2 for queries longer
+    # than five characters), by walking the trie with one Levenshtein row per node
+    # and pruning every branch whose row is already over the bound
+    def fuzzy(self, query, limit=None, max_distance=None):
+        limit = limit or self.limit
+        if max_distance is None:
+            max_distance = 1 if len(query) <= 5 else 2
+        if len(query) < 3:
+            return []
+
+        found = []
+        stack = [(child, char, range(len(query) + 1)) for char, child in self.root.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            row = [previous[0] + 1]
+            for column in range(1, len(query) + 1):
+                cost = 0 if query[column - 1] == char else 1
+                row.append(min(row[column - 1] + 1, previous[column] + 1, previous[column - 1] + cost))
+
+            if row[-1] <= max_distance:
+                for entry in node.entries:
+                    found.append(((FUZZY + row[-1], *entry[0][1:]), *entry[1:]))
+            if min(row) <= max_distance:
+                stack.extend((child, next_char, row) for next_char, child in node.children.items())
+
+        return [_match(entry) for entry in _merge([], sorted(found), limit)]
+
+    # Index the registry units not indexed yet under their names, aliases and
+    # symbols, and each later word of a multi-word name ("meters" in "Square
+    # Meters"). Cheap when nothing was added: one length check per category.
+    def sync(self, registry=UNIT_REGISTRY):
+        for category, entry in registry.items():
+            if len(entry["units"]) == self.counts.get(category, 0):
+                continue
+            with self._lock:
+                known = self.counts.get(category, 0)
+                units = entry["units"][known:]
+                for unit in units:
+                    self.insert(unit, category, unit)
+                    words = unit.split()
+                    for start in range(1, len(words)):
+                        self.insert(" ".join(words[start:]), category, unit, WORD_PREFIX)
+
+                new = set(units)
+                for alias, unit in list(entry["aliases"].items()):
+                    if unit in new:
+                        self.insert(alias, category, unit)
+                self.counts[category] = known + len(units)
+
+# Merge two ranked entry lists, keeping the best entry per unit
+def _merge(first, second, limit):
+    merged = []
+    seen = set()
+    for entry in sorted(first + second):
+        if (entry[2], entry[3]) not in seen:
+            seen.add((entry[2], entry[3]))
+            merged.append(entry)
+            if len(merged) == limit:
+                break
+    return merged
+
+def _match(entry):
+    return SearchMatch(entry[3], entry[2], entry[1], entry[0][0])
+
+def build_index(registry=UNIT_REGISTRY):
+    index = UnitIndex()
+    index.sync(registry)
+    return index
+
+UNIT_INDEX = build_index()
+
+# Search every category's units, best match first. The index ignores case, so a
+# query that names a unit exactly ("Mm" is a megameter) puts that unit first;
+# naming a prefixed unit that has not been generated yet ("ZiB") generates it.
+def search(query, limit=None):
+    try:
+        category, unit = find_unit(query.strip())
+    except KeyError:
+        category = unit = None
+
+    UNIT_INDEX.sync()
+    matches = UNIT_INDEX.search(query, limit)
+    if unit is None:
+        return matches
+    others = [match for match in matches if (match.category, match.unit) != (category, unit)]
+    return [SearchMatch(unit, category, query.strip().lower(), EXACT), *others][:limit or UNIT_INDEX.limit]
@@ -0,0 +1,253 @@
+# Local HTTP conversion service built on the conversion core (WSGI, standard library only).
+#
+#   GET  /health
+#   GET  /convert?value=12&from=Feet&to=Meters[&category=Length]
+#   GET  /convert?q=3.2+mi+to+km
+#   GET  /expression?q=90+km/h+->+m/s
+#   GET  /metrics   (Prometheus text for this worker; collected with UNIT_CONVERTER_METRICS=1)
+#   POST /convert   {"value": 12, "from": "Feet", "to": "Meters", "category": "Length"}
+#   POST /convert   {"expression": "1500 W*h -> kJ"}
+#   POST /expression {"expression": "1500 W*h -> kJ"}
+#   POST /batch     {"conversions": [[12, "Feet", "Meters"], [1, "kg", "lb"], ...]}
+#   POST /batch     {"values": [1, 2, 3], "from": "Feet", "to": "Meters"}
+#   POST /batch     {"expressions": ["3.2 mi to km", "90 km/h -> m/s", ...]}
+#
+# Results too large for float64 come back as null. Batches go through the
+# vectorized converter. Run it with `python service.py --workers 4` (pre-forked
+# worker processes sharing one listening socket), or under any WSGI server,
+# e.g. `gunicorn -w 4 service:application`.
+import argparse
+import json
+import math
+import os
+import signal
+import sys
+import time
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from converter import convert, convert_array, convert_triples, resolve_pair
+from expressions import compile_request, evaluate_many
+from metrics import metrics
+
+# Largest request body accepted, in bytes
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+class RequestError(Exception):
+    def __init__(self, message, status="400 Bad Request"):
+        super().__init__(message)
+        self.status = status
+
+def _read_json(environ):
+    try:
+        length = int(environ.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        raise RequestError("Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise RequestError("Request body too large", "413 Payload Too Large")
+
+    try:
+        body = json.loads(environ["wsgi.input"].read(length) or b"{}")
+    except ValueError as e:
+        raise RequestError(f"Invalid JSON: {e}")
+    if not isinstance(body, dict):
+        raise RequestError("Request body must be a JSON object")
+    return body
+
+# Unit names and categories must be strings; JSON numbers or lists are rejected
+# here rather than failing inside the converter
+def _check_names(*names):
+    for name in names:
+        if not isinstance(name, str):
+            raise RequestError(f"Unit and category names must be strings, got {json.dumps(name)}")
+
+def _resolve(params):
+    _check_names(params.get("from", ""), params.get("to", ""), params.get("category") or "")
+    try:
+        return resolve_pair(params.get("category"), params["from"], params["to"])
+    except KeyError as e:
+        raise RequestError(f"Unknown unit or missing field: {e.args[0]}")
+
+# Free-text request ("3.2 mi to km"), also covering compound units ("kWh/m² to J/cm²")
+def handle_expression(text):
+    try:
+        value, plan = compile_request(text)
+    except (KeyError, ValueError, OverflowError) as e:
+        raise RequestError(f"Invalid expression: {e.args[0]}")
+
+    return {
+        "expression": text,
+        "value": _finite(float(value)),
+        "from_unit": plan.source,
+        "to_unit": plan.target,
+        "result": _finite(plan.convert(float(value)))
+    }
+
+def handle_convert(params):
+    expression = params.get("expression", params.get("q"))
+    if expression is not None:
+        return handle_expression(str(expression))
+
+    category, from_unit, to_unit = _resolve(params)
+    try:
+        value = float(params["value"])
+    except (KeyError, TypeError, ValueError):
+        raise RequestError("Missing or invalid value")
+    if not math.isfinite(value):
+        raise RequestError("Value must be a finite number")
+
+    return {
+        "category": category,
+        "value": value,
+        "from_unit": from_unit,
+        "to_unit": to_unit,
+        "result": _finite(convert(category, value, from_unit, to_unit))
+    }
+
+# /expression: the expression form of /convert on its own path
+def handle_expression_request(params):
+    expression = params.get("expression", params.get("q"))
+    if expression is None:
+        raise RequestError("Missing expression")
+    return handle_expression(str(expression))
+
+def handle_batch(body):
+    try:
+        if "expressions" in body:
+            if not isinstance(body["expressions"], list):
+                raise RequestError("expressions must be a list of strings")
+            results = evaluate_many([str(text) for text in body["expressions"]])
+        elif "values" in body:
+            if not isinstance(body["values"], list):
+                raise RequestError("values must be a list of numbers")
+            category, from_unit, to_unit = _resolve(body)
+            results = convert_array(category, body["values"], from_unit, to_unit)
+            # Nested lists would convert elementwise into a 2-D array
+            if results.ndim != 1:
+                raise RequestError("values must be a flat list of numbers")
+        else:
+            conversions = body["conversions"]
+            if not isinstance(conversions, list):
+                raise RequestError("conversions must be a list of [value, from, to] triples")
+            _check_names(body.get("category") or "")
+            for triple in conversions:
+                if not isinstance(triple, list) or len(triple) != 3:
+                    raise RequestError(f"Invalid conversion {json.dumps(triple)}: expected [value, from, to]")
+                _check_names(triple[1], triple[2])
+            results = convert_triples(conversions, body.get("category"))
+    except RequestError:
+        raise
+    except KeyError as e:
+        raise RequestError(f"Unknown unit or missing field: {e.args[0]}")
+    except (AttributeError, TypeError, ValueError) as e:
+        raise RequestError(f"Invalid batch: {e}")
+
+    return {"count": len(results), "results": [_finite(result) for result in results.tolist()]}
+
+# JSON has no Infinity or NaN: results that overflow float64 are sent as null
+def _finite(result):
+    return result if math.isfinite(result) else None
+
+def _query(environ):
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    return {key: values[0] for key, values in query.items()}
+
+# The WSGI application
+def application(environ, start_response):
+    started = time.perf_counter()
+    method = environ["REQUEST_METHOD"]
+    path = environ.get("PATH_INFO", "/").rstrip("/") or "/"
+
+    content_type = "application/json"
+    try:
+        if path == "/health":
+            payload = {"status": "ok"}
+        elif path == "/metrics" and method == "GET":
+            payload, content_type = metrics.prometheus(), "text/plain; version=0.0.4"
+        elif path == "/convert" and method == "GET":
+            payload = handle_convert(_query(environ))
+        elif path == "/convert" and method == "POST":
+            payload = handle_convert(_read_json(environ))
+        elif path == "/expression" and method == "GET":
+            payload = handle_expression_request(_query(environ))
+        elif path == "/expression" and method == "POST":
+            payload = handle_expression_request(_read_json(environ))
+        elif path == "/batch" and method == "POST":
+            payload = handle_batch(_read_json(environ))
+        elif path in ("/convert", "/expression", "/batch", "/metrics"):
+            raise RequestError("Method not allowed", "405 Method Not Allowed")
+        else:
+            raise RequestError("Not found", "404 Not Found")
+        status = "200 OK"
+    except RequestError as e:
+        status, payload = e.status, {"error": str(e)}
+
+    if content_type == "application/json":
+        body = json.dumps(payload, allow_nan=False).encode()
+    else:
+        body = payload.encode()
+    start_response(status, [
+        ("Content-Type", content_type),
+        ("Content-Length", str(len(body)))
+    ])
+
+    # Unknown paths share one label, so scanners cannot grow the label set
+    label = path if path in ("/health", "/metrics", "/convert", "/expression", "/batch") else "other"
+    metrics.increment("service_requests_total", path=label, status=status.split()[0])
+    metrics.observe("service_request_seconds", time.perf_counter() - started, path=label)
+    return [body]
+
+# wsgiref logs every request to stderr, which costs more than the conversion
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+# Serve with a pool of pre-forked worker processes accepting on the same socket
+def serve(host="127.0.0.1", port=8000, workers=1):
+    server = make_server(host, port, application, server_class=WSGIServer,
+                         handler_class=QuietRequestHandler)
+
+    children = []
+    if hasattr(os, "fork"):
+        for _ in range(workers - 1):
+            pid = os.fork()
+            if pid == 0:
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                try:
+                    server.serve_forever()
+                finally:
+                    os._exit(0)
+            children.append(pid)
+
+    # A process manager stops the server with SIGTERM: shut down as on Ctrl-C, so
+    # the workers are stopped too instead of being left holding the socket
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    print(f"Serving unit conversions on http://{host}:{port} with {len(children) + 1} worker(s)",
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+            os.waitpid(pid, 0)
+        server.server_close()
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="unit-convert-server", description="Local HTTP unit conversion service")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (default: number of CPUs)")
+    args = parser.parse_args(argv)
+
+    serve(args.host, args.port, max(1, args.workers))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,406 @@
+# Persistent history and favorites in a local SQLite file shared by every session
+# of the app but private to a profile: every row carries its profile key, and
+# every read, insert and clear is limited to it. Rows are indexed by profile,
+# category, units and time and read back one page at a time, so nothing is held
+# in process memory between reruns.
+#
+# Every session starts on a new random profile, so the file is kept bounded:
+# history keeps the newest HISTORY_LIMIT rows per profile, and profiles not used
+# for PROFILE_MAX_AGE seconds are deleted with all their rows.
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# Database file; set UNIT_CONVERTER_DB to an empty string to keep history and
+# favorites in session memory instead
+DB_PATH = os.environ.get("UNIT_CONVERTER_DB", "unit_converter.db")
+
+# History rows kept per profile; the oldest are dropped as new ones arrive
+HISTORY_LIMIT = 100_000
+
+# Seconds a profile is kept after it was last opened or written to (default 30
+# days, UNIT_CONVERTER_PROFILE_DAYS to change), and how often stale ones are pruned
+PROFILE_MAX_AGE = int(float(os.environ.get("UNIT_CONVERTER_PROFILE_DAYS", "30")) * 86400)
+PRUNE_INTERVAL = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    value REAL NOT NULL,
+    from_unit TEXT NOT NULL,
+    to_unit TEXT NOT NULL,
+    result REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_time ON history (user, timestamp);
+CREATE INDEX IF NOT EXISTS history_category ON history (user, category, timestamp);
+CREATE INDEX IF NOT EXISTS history_units ON history (user, from_unit, to_unit);
+
+-- Running aggregates, updated with every history insert
+CREATE TABLE IF NOT EXISTS history_categories (
+    user TEXT NOT NULL,
+    category TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user, category)
+);
+CREATE TABLE IF NOT EXISTS history_pairs (
+    user TEXT NOT NULL,
+    category TEXT NOT NULL,
+    from_unit TEXT NOT NULL,
+    to_unit TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user, category, from_unit, to_unit)
+);
+CREATE TABLE IF NOT EXISTS history_hours (
+    user TEXT NOT NULL,
+    hour INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (user, hour)
+);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    category TEXT NOT NULL,
+    value REAL NOT NULL,
+    from_unit TEXT NOT NULL,
+    to_unit TEXT NOT NULL,
+    result REAL NOT NULL,
+    UNIQUE (user, category, from_unit, to_unit, value)
+);
+
+-- When each profile was last used, for pruning stale ones
+CREATE TABLE IF NOT EXISTS profiles (
+    user TEXT PRIMARY KEY,
+    last_seen INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS profiles_last_seen ON profiles (last_seen);
+"""
+
+# Tables holding per-profile rows
+PROFILE_TABLES = ["history", "history_categories", "history_pairs", "history_hours", "favorites"]
+
+# Fill the aggregate tables from existing rows of a database created before they existed
+BACKFILL = """
+INSERT INTO history_categories
+    SELECT user, category, COUNT(*) FROM history GROUP BY user, category;
+INSERT INTO history_pairs
+    SELECT user, category, from_unit, to_unit, COUNT(*) FROM history GROUP BY user, category, from_unit, to_unit;
+INSERT INTO history_hours
+    SELECT user, timestamp / 3600, COUNT(*) FROM history GROUP BY user, timestamp / 3600;
+"""
+
+# Register the profiles of a database created before the profiles table existed,
+# as last used now
+BACKFILL_PROFILES = """
+INSERT OR IGNORE INTO profiles SELECT DISTINCT user, CAST(strftime('%s', 'now') AS INTEGER) FROM history;
+INSERT OR IGNORE INTO profiles SELECT DISTINCT user, CAST(strftime('%s', 'now') AS INTEGER) FROM favorites;
+"""
+
+# Add one conversion to the aggregates
+UPDATE_STATS = [
+    "INSERT INTO history_categories VALUES (?, ?, 1) "
+    "ON CONFLICT (user, category) DO UPDATE SET count = count + 1",
+    "INSERT INTO history_pairs VALUES (?, ?, ?, ?, 1) "
+    "ON CONFLICT (user, category, from_unit, to_unit) DO UPDATE SET count = count + 1",
+    "INSERT INTO history_hours VALUES (?, ?, 1) "
+    "ON CONFLICT (user, hour) DO UPDATE SET count = count + 1"
+]
+
+# Take one dropped row out of the aggregates; counts that reach zero are deleted after
+REMOVE_STATS = [
+    "UPDATE history_categories SET count = count - 1 WHERE user = ? AND category = ?",
+    "UPDATE history_pairs SET count = count - 1 WHERE user = ? AND category = ? AND from_unit = ? AND to_unit = ?",
+    "UPDATE history_hours SET count = count - 1 WHERE user = ? AND hour = ?"
+]
+
+# Mark a profile as used now
+TOUCH_PROFILE = (
+    "INSERT INTO profiles VALUES (?, ?) "
+    "ON CONFLICT (user) DO UPDATE SET last_seen = excluded.last_seen"
+)
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+# One connection per database file for the whole process, guarded by a lock since
+# Streamlit runs sessions on different threads
+def connect(path):
+    with _connections_lock:
+        if path not in _connections:
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            has_stats = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'history_hours'"
+            ).fetchone()
+            has_profiles = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'profiles'"
+            ).fetchone()
+            db.executescript(SCHEMA)
+            if not has_stats:
+                db.executescript(f"BEGIN; {BACKFILL} COMMIT;")
+            if not has_profiles:
+                db.executescript(f"BEGIN; {BACKFILL_PROFILES} COMMIT;")
+            _connections[path] = (db, threading.Lock())
+        return _connections[path]
+
+# The connection is in autocommit mode; group statements explicitly (hold the lock)
+@contextmanager
+def transaction(db):
+    db.execute("BEGIN")
+    try:
+        yield
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    db.execute("COMMIT")
+
+# Delete every profile not used for max_age seconds, with all its rows. Returns
+# the number of profiles deleted.
+def prune_profiles(path, max_age=PROFILE_MAX_AGE, now=None):
+    cutoff = (int(time.time()) if now is None else now) - max_age
+    db, lock = connect(path)
+    with lock:
+        with transaction(db):
+            stale = "SELECT user FROM profiles WHERE last_seen < ?"
+            for table in PROFILE_TABLES:
+                db.execute(f"DELETE FROM {table} WHERE user IN ({stale})", (cutoff,))
+            return db.execute("DELETE FROM profiles WHERE last_seen < ?", (cutoff,)).rowcount
+
+_last_pruned = {}
+
+# prune_profiles at most once per PRUNE_INTERVAL per database in this process
+def _prune_now_and_then(path):
+    now = time.time()
+    with _connections_lock:
+        if now - _last_pruned.get(path, 0) < PRUNE_INTERVAL:
+            return
+        _last_pruned[path] = now
+    prune_profiles(path)
+
+class _Table:
+    def __init__(self, path, user="default"):
+        self.user = user
+        self._db, self._lock = connect(path)
+        _prune_now_and_then(path)
+        # Opening a profile that has rows keeps it from being pruned; a profile is
+        # only registered once something is written to it
+        self._execute("UPDATE profiles SET last_seen = ? WHERE user = ?", (int(time.time()), user))
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            return cursor.fetchall(), cursor.rowcount
+
+    # Group statements into one transaction (hold _lock)
+    def _transaction(self):
+        return transaction(self._db)
+
+    # Mark this profile as used (inside a transaction)
+    def _touch(self):
+        self._db.execute(TOUCH_PROFILE, (self.user, int(time.time())))
+
+# Same interface as history.HistoryBuffer
+class HistoryStore(_Table):
+    def __init__(self, path, user="default", capacity=HISTORY_LIMIT):
+        super().__init__(path, user)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.count()
+
+    # Insert the row and bump its aggregates in one transaction, dropping the
+    # oldest row once the profile holds more than `capacity`
+    def append(self, category, value, from_unit, to_unit, result, timestamp=None):
+        timestamp = int(time.time()) if timestamp is None else timestamp
+        with self._lock:
+            with self._transaction():
+                self._db.execute(
+                    "INSERT INTO history (user, timestamp, category, value, from_unit, to_unit, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.user, timestamp, category, value, from_unit, to_unit, result)
+                )
+                self._db.execute(UPDATE_STATS[0], (self.user, category))
+                self._db.execute(UPDATE_STATS[1], (self.user, category, from_unit, to_unit))
+                self._db.execute(UPDATE_STATS[2], (self.user, timestamp // 3600))
+                self._touch()
+                self._trim()
+
+    # Change the capacity, keeping the newest rows that still fit
+    def resize(self, capacity):
+        with self._lock:
+            with self._transaction():
+                self.capacity = capacity
+                self._trim()
+
+    # Drop the oldest rows beyond capacity and take them out of the aggregates
+    # (hold _lock, inside a transaction). The row count is read from the small
+    # per-category aggregate rather than counted.
+    def _trim(self):
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM history_categories WHERE user = ?", (self.user,)
+        ).fetchone()[0]
+        if total <= self.capacity:
+            return
+
+        rows = self._db.execute(
+            "SELECT id, timestamp, category, from_unit, to_unit FROM history WHERE user = ? "
+            "ORDER BY timestamp, id LIMIT ?",
+            (self.user, total - self.capacity)
+        ).fetchall()
+        self._db.executemany("DELETE FROM history WHERE id = ?", [(row[0],) for row in rows])
+        self._db.executemany(REMOVE_STATS[0], [(self.user, row[2]) for row in rows])
+        self._db.executemany(REMOVE_STATS[1], [(self.user, row[2], row[3], row[4]) for row in rows])
+        self._db.executemany(REMOVE_STATS[2], [(self.user, row[1] // 3600) for row in rows])
+        for table in ("history_categories", "history_pairs", "history_hours"):
+            self._db.execute(f"DELETE FROM {table} WHERE user = ? AND count <= 0", (self.user,))
+
+    def clear(self):
+        with self._lock:
+            with self._transaction():
+                for table in ("history", "history_categories", "history_pairs", "history_hours"):
+                    self._db.execute(f"DELETE FROM {table} WHERE user = ?", (self.user,))
+
+    def count(self, category=None):
+        if category is None:
+            rows, _ = self._execute("SELECT COUNT(*) FROM history WHERE user = ?", (self.user,))
+        else:
+            rows, _ = self._execute(
+                "SELECT COUNT(*) FROM history WHERE user = ? AND category = ?", (self.user, category)
+            )
+        return rows[0][0]
+
+    # Rows per category name
+    def category_counts(self):
+        rows, _ = self._execute(
+            "SELECT category, count FROM history_categories WHERE user = ?", (self.user,)
+        )
+        return dict(rows)
+
+    # Most used (category, from_unit, to_unit, count) combinations
+    def top_pairs(self, n=10):
+        rows, _ = self._execute(
+            "SELECT category, from_unit, to_unit, count FROM history_pairs WHERE user = ? "
+            "ORDER BY count DESC LIMIT ?",
+            (self.user, n)
+        )
+        return rows
+
+    # (hour start as epoch seconds, conversions) in time order
+    def hourly_counts(self):
+        rows, _ = self._execute(
+            "SELECT hour * 3600, count FROM history_hours WHERE user = ? ORDER BY hour", (self.user,)
+        )
+        return rows
+
+    # One page of rows, newest first
+    def page(self, offset=0, limit=100, category=None):
+        import pandas as pd
+
+        columns = "timestamp, category, value, from_unit, to_unit, result"
+        if category is None:
+            rows, _ = self._execute(
+                f"SELECT {columns} FROM history WHERE user = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                (self.user, limit, offset)
+            )
+        else:
+            rows, _ = self._execute(
+                f"SELECT {columns} FROM history WHERE user = ? AND category = ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                (self.user, category, limit, offset)
+            )
+
+        frame = pd.DataFrame(rows, columns=["timestamp", "category", "value", "from_unit", "to_unit", "result"])
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="s")
+        return frame
+
+# Same interface as favorites.SessionFavorites
+class FavoritesStore(_Table):
+    def __len__(self):
+        return self.count()
+
+    # Number of favorites matching a search, see items()
+    def count(self, query=None, category=None):
+        where, params = self._where(query, category)
+        rows, _ = self._execute(f"SELECT COUNT(*) FROM favorites WHERE {where}", params)
+        return rows[0][0]
+
+    # Answered from the unique (user, category, from_unit, to_unit, value) index
+    def contains(self, category, value, from_unit, to_unit):
+        rows, _ = self._execute(
+            "SELECT 1 FROM favorites WHERE user = ? AND category = ? AND from_unit = ? "
+            "AND to_unit = ? AND value = ?",
+            (self.user, category, from_unit, to_unit, value)
+        )
+        return bool(rows)
+
+    # Add a favorite; returns False if the same conversion is already saved
+    def add(self, category, value, from_unit, to_unit, result):
+        with self._lock:
+            with self._transaction():
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO favorites (user, category, value, from_unit, to_unit, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.user, category, value, from_unit, to_unit, result)
+                ).rowcount
+                self._touch()
+        return inserted == 1
+
+    def remove(self, favorite_id):
+        _, deleted = self._execute(
+            "DELETE FROM favorites WHERE user = ? AND id = ?", (self.user, favorite_id)
+        )
+        return deleted == 1
+
+    def clear(self):
+        self._execute("DELETE FROM favorites WHERE user = ?", (self.user,))
+
+    # Replace every favorite with `entries` ((category, value, from_unit, to_unit,
+    # result) tuples) in one transaction, so a failed import leaves them untouched
+    def replace_all(self, entries):
+        with self._lock:
+            with self._transaction():
+                self._db.execute("DELETE FROM favorites WHERE user = ?", (self.user,))
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO favorites (user, category, value, from_unit, to_unit, result) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(self.user, *entry) for entry in entries]
+                )
+                self._touch()
+
+    # Favorites in insertion order, optionally one page of those whose category or
+    # units contain `query` (case-insensitive) and/or of one category
+    def items(self, offset=0, limit=None, query=None, category=None):
+        where, params = self._where(query, category)
+        rows, _ = self._execute(
+            "SELECT id, category, value, from_unit, to_unit, result FROM favorites "
+            f"WHERE {where} ORDER BY id LIMIT ? OFFSET ?",
+            (*params, -1 if limit is None else limit, offset)
+        )
+        return [
+            {"id": row[0], "category": row[1], "value": row[2],
+             "from_unit": row[3], "to_unit": row[4], "result": row[5]}
+            for row in rows
+        ]
+
+    def _where(self, query, category):
+        where, params = ["user = ?"], [self.user]
+        if category is not None:
+            where.append("category = ?")
+            params.append(category)
+        if query:
+            # A plain substring match, as in SessionFavorites: "%" and "_" in the
+            # query are literal characters, not wildcards
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            pattern = f"%{escaped}%"
+            where.append(
+                "(category LIKE ? ESCAPE '\\' OR from_unit LIKE ? ESCAPE '\\' OR to_unit LIKE ? ESCAPE '\\')"
+            )
+            params += [pattern, pattern, pattern]
+        return " AND ".join(where), params
@@ -0,0 +1,110 @@
+# Tests for the conversion core: prefixed units generated on demand, decimal and
+# binary data sizes, and exact coefficients composed through the base unit.
+#
+#   python -m pytest -q
+from fractions import Fraction
+
+import pytest
+
+from converter import (UNIT_DEFINITIONS, UNIT_REGISTRY, convert, convert_columns, convert_exact, convert_to_all,
+                       find_category, find_unit, resolve_unit)
+
+# Prefix parsing: symbols are case-sensitive, spelled-out names are not
+
+@pytest.mark.parametrize("name, unit", [
+    ("Mm", "Megameters"),
+    ("mm", "Millimeters"),
+    ("MM", "Millimeters"),
+    ("nm", "Nanometers"),
+    ("nanometres", "Nanometers"),
+    ("Kilometers", "Kilometers"),
+    ("km", "Kilometers")
+])
+def test_length_resolution_order(name, unit):
+    assert resolve_unit("Length", name) == unit
+
+def test_symbols_match_before_other_categories():
+    assert find_unit("Mm") == ("Length", "Megameters")
+    assert find_unit("mm") == ("Length", "Millimeters")
+    assert find_category("GiB", "MB") == ("Data", "Gibibytes", "Megabytes")
+
+@pytest.mark.parametrize("name, unit", [
+    ("kB", "Kilobytes"),
+    ("KB", "Kilobytes"),
+    ("Mb", "Megabits"),
+    ("MB", "Megabytes"),
+    ("GiB", "Gibibytes"),
+    ("ZiB", "Zebibytes"),
+    ("exabytes", "Exabytes")
+])
+def test_data_symbols(name, unit):
+    assert resolve_unit("Data", name) == unit
+
+def test_unknown_prefix_is_rejected():
+    with pytest.raises(KeyError):
+        resolve_unit("Length", "Qxm")
+    with pytest.raises(KeyError):
+        resolve_unit("Weight", "kibigrams")
+
+# Data sizes: SI prefixes are decimal, IEC prefixes binary
+
+@pytest.mark.parametrize("unit, factor", [
+    ("Kilobytes", 1000),
+    ("Kilobits", 125),
+    ("Megabytes", 10 ** 6),
+    ("Kibibytes", 1024),
+    ("Mebibytes", 2 ** 20),
+    ("Gibibytes", 2 ** 30)
+])
+def test_data_factors(unit, factor):
+    assert convert_exact("Data", 1, unit, "Bytes") == factor
+
+def test_generated_binary_factors():
+    assert convert_exact("Data", 1, resolve_unit("Data", "EiB"), "Bytes") == 2 ** 60
+    assert convert_exact("Data", 1, resolve_unit("Data", "Ebit"), "Bytes") == 10 ** 18 // 8
+
+# Exact pair composition through the base unit
+
+def test_exact_coefficients_compose():
+    assert convert_exact("Length", 1, "Miles", "Feet") == 5280
+    assert convert_exact("Length", "0.1", "Meters", "Millimeters") == 100
+    assert convert_exact("Temperature", 212, "Fahrenheit", "Celsius") == 100
+    assert convert_exact("Temperature", 0, "Celsius", "Kelvin") == Fraction(27315, 100)
+
+def test_generated_unit_coefficients_compose_both_ways():
+    unit = resolve_unit("Temperature", "mK")
+    assert unit == "Millikelvin"
+    assert convert_exact("Temperature", 1, unit, "Celsius") == Fraction(-273149, 1000)
+    assert convert_exact("Temperature", 0, "Celsius", unit) == 273150
+    assert convert_exact("Length", 1, resolve_unit("Length", "Mm"), "Kilometers") == 1000
+    assert convert_exact("Length", 1, "Miles", resolve_unit("Length", "µm")) == 1609344000
+
+def test_generated_pair_matches_float_path():
+    unit = resolve_unit("Pressure", "hPa")
+    for other in UNIT_REGISTRY["Pressure"]["units"]:
+        assert convert("Pressure", 3.5, unit, other) == pytest.approx(float(convert_exact("Pressure", 3.5, unit, other)))
+
+# Generated units join the registry, not the defined unit lists
+
+def test_generated_units_leave_definitions_alone():
+    resolve_unit("Length", "rm")
+    assert "Rontometers" in UNIT_REGISTRY["Length"]["index"]
+    assert "Rontometers" not in UNIT_DEFINITIONS["Length"]["factors"]
+
+def test_convert_to_all_in_given_order():
+    units = ["Meters", resolve_unit("Length", "Gm"), "Feet"]
+    assert convert_to_all("Length", 1000.0, "Kilometers", units).tolist() == pytest.approx([1e6, 1e-3, 1e6 / 0.3048])
+
+# Columnar conversion with integer unit codes
+
+def test_convert_columns_codes():
+    index = UNIT_REGISTRY["Length"]["index"]
+    assert convert_columns("Length", [1.0, 2.0], [index["Miles"], index["Feet"]], [index["Meters"]] * 2).tolist() == \
+        pytest.approx([1609.344, 0.6096])
+
+@pytest.mark.parametrize("code", [-1, 10 ** 6])
+def test_convert_columns_rejects_codes_out_of_range(code):
+    with pytest.raises(ValueError):
+        convert_columns("Length", [1.0], [code], [0])
+    with pytest.raises(ValueError):
+        convert_columns("Length", [1.0], [0], [code])
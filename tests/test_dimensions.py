@@ -0,0 +1,49 @@
+# Tests for unit expression parsing in the dimensions engine
+from fractions import Fraction
+
+import pytest
+
+from dimensions import EXTRA_UNITS, DimensionError, conversion_plan, parse_unit
+
+# Spelled-out names of the extra units, singular, plural and prefixed
+
+@pytest.mark.parametrize("name, symbol, scale", [
+    ("watt", "W", 1),
+    ("watts", "W", 1),
+    ("kilowatts", "W", 1000),
+    ("newtons", "N", 1),
+    ("hertz", "Hz", 1),
+    ("megahertz", "Hz", 10 ** 6),
+    ("amperes", "A", 1),
+    ("milliamps", "A", Fraction(1, 1000)),
+    ("volts", "V", 1),
+    ("moles", "mol", 1)
+])
+def test_extra_unit_names(name, symbol, scale):
+    unit = parse_unit(name)
+    assert unit.dimension == EXTRA_UNITS[symbol][0]
+    assert unit.scale == scale
+
+def test_prefixed_symbols_are_case_sensitive():
+    assert parse_unit("Mm").scale == 10 ** 6
+    assert parse_unit("mm").scale == Fraction(1, 1000)
+    assert parse_unit("MW").scale == 10 ** 6
+    assert parse_unit("mW").scale == Fraction(1, 1000)
+
+def test_compound_names():
+    assert conversion_plan("kilowatt hours", "kJ").convert_exact(1) == 3600
+    assert conversion_plan("watts", "J/s").convert_exact(5) == 5
+
+# Powers are bounded, and plans whose factor overflows float64 are rejected
+
+@pytest.mark.parametrize("expression", ["km^65", "m^2000000", "s^-100", "m2000000", "(km^64)^64", "(1e300^60)^60"])
+def test_large_exponents_are_rejected(expression):
+    with pytest.raises(DimensionError):
+        parse_unit(expression)
+
+def test_exponent_limit_is_inclusive():
+    assert parse_unit("m^64").dimension[0] == 64
+
+def test_float_overflow_is_a_dimension_error():
+    with pytest.raises(DimensionError):
+        conversion_plan("km^60 * km^60", "m^60 * m^60")
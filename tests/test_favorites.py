@@ -0,0 +1,34 @@
+# Tests for the in-memory favorites
+from favorites import SessionFavorites
+
+def test_add_deduplicates_equal_values():
+    favorites = SessionFavorites()
+    assert favorites.add("Length", 1, "Feet", "Meters", 0.3048)
+    assert not favorites.add("Length", 1.0, "Feet", "Meters", 0.3048)
+    assert favorites.contains("Length", 1.0, "Feet", "Meters")
+    assert len(favorites) == 1
+
+def test_ids_survive_removals():
+    favorites = SessionFavorites()
+    for value in range(3):
+        favorites.add("Length", value, "Feet", "Meters", value * 0.3048)
+    first, second, third = (favorite["id"] for favorite in favorites.items())
+    assert favorites.remove(second)
+    assert not favorites.remove(second)
+    assert [favorite["id"] for favorite in favorites.items()] == [first, third]
+
+def test_search_and_pages():
+    favorites = SessionFavorites()
+    favorites.add("Length", 1.0, "Feet", "Meters", 0.3048)
+    favorites.add("Weight", 1.0, "Kilograms", "Pounds", 2.2)
+    favorites.add("Weight", 2.0, "Kilograms", "Pounds", 4.4)
+    assert [f["value"] for f in favorites.items(query="POUND")] == [1.0, 2.0]
+    assert favorites.count(query="feet") == 1
+    assert favorites.count(category="Weight") == 2
+    assert [f["value"] for f in favorites.items(offset=1, limit=1, category="Weight")] == [2.0]
+
+def test_replace_all():
+    favorites = SessionFavorites()
+    favorites.add("Length", 1.0, "Feet", "Meters", 0.3048)
+    favorites.replace_all([("Weight", 2.0, "Kilograms", "Pounds", 4.4), ("Weight", 2.0, "Kilograms", "Pounds", 4.4)])
+    assert [(f["category"], f["value"]) for f in favorites.items()] == [("Weight", 2.0)]
@@ -0,0 +1,51 @@
+# Tests for the in-memory ring-buffer history and its running aggregates
+from history import HistoryBuffer
+
+def fill(history, rows, start=0):
+    for i in range(start, start + rows):
+        category, units = [("Length", ("Feet", "Meters")), ("Weight", ("Kilograms", "Pounds"))][i % 2]
+        history.append(category, float(i), *units, float(i), timestamp=1_700_000_000 + 600 * i)
+
+def test_append_and_page():
+    history = HistoryBuffer(10)
+    fill(history, 5)
+    assert len(history) == 5
+    assert history.page(limit=2)["value"].tolist() == [4.0, 3.0]
+    assert history.page(category="Weight")["value"].tolist() == [3.0, 1.0]
+    assert history.to_frame()["value"].tolist() == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+def test_wrap_around_keeps_newest_rows():
+    history = HistoryBuffer(4)
+    fill(history, 7)
+    assert len(history) == 4
+    assert history.to_frame()["value"].tolist() == [3.0, 4.0, 5.0, 6.0]
+    assert history.page()["value"].tolist() == [6.0, 5.0, 4.0, 3.0]
+    assert history.page(offset=1, limit=2, category="Length")["value"].tolist() == [4.0]
+    assert history.count("Length") == 2
+
+def test_aggregates_follow_overwritten_rows():
+    history = HistoryBuffer(3)
+    fill(history, 5)
+    assert history.category_counts() == {"Length": 2, "Weight": 1}
+    assert history.top_pairs(1) == [("Length", "Feet", "Meters", 2)]
+    assert sum(count for _, count in history.hourly_counts()) == 3
+
+def test_resize_keeps_newest_rows():
+    history = HistoryBuffer(4)
+    fill(history, 6)
+    history.resize(2)
+    assert history.to_frame()["value"].tolist() == [4.0, 5.0]
+    assert history.category_counts() == {"Length": 1, "Weight": 1}
+
+    history.resize(5)
+    fill(history, 4, start=6)
+    assert history.to_frame()["value"].tolist() == [5.0, 6.0, 7.0, 8.0, 9.0]
+    assert history.category_counts() == {"Length": 2, "Weight": 3}
+
+def test_clear():
+    history = HistoryBuffer(4)
+    fill(history, 6)
+    history.clear()
+    assert len(history) == 0
+    assert history.category_counts() == {}
+    assert history.page().empty
@@ -0,0 +1,127 @@
+# Tests for the HTTP service, calling the WSGI application directly
+import io
+import json
+
+import pytest
+
+from metrics import metrics
+from service import application
+
+def request(method, path, body=None, query=""):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode() if body is not None else b""
+    environ = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_LENGTH": str(len(data)),
+        "wsgi.input": io.BytesIO(data)
+    }
+    response = {}
+
+    def start_response(status, headers):
+        response["status"] = int(status.split()[0])
+        response["headers"] = dict(headers)
+
+    body = b"".join(application(environ, start_response))
+    if response["headers"]["Content-Type"] == "application/json":
+        return response["status"], json.loads(body)
+    return response["status"], body.decode()
+
+# /convert
+
+def test_convert_get():
+    status, payload = request("GET", "/convert", query="value=12&from=Feet&to=Meters")
+    assert status == 200
+    assert payload["result"] == pytest.approx(3.6576)
+
+def test_convert_post_with_aliases():
+    status, payload = request("POST", "/convert", {"value": 1, "from": "kg", "to": "lb"})
+    assert status == 200
+    assert (payload["category"], payload["from_unit"], payload["to_unit"]) == ("Weight", "Kilograms", "Pounds")
+
+def test_convert_overflow_is_null():
+    status, payload = request("POST", "/convert", {"value": 1e308, "from": "km", "to": "mm"})
+    assert status == 200
+    assert payload["result"] is None
+
+@pytest.mark.parametrize("body", [
+    b"[1, 2]",
+    b"not json",
+    {"value": 1, "from": 5, "to": "m"},
+    {"value": 1, "from": "ft", "to": "m", "category": ["Length"]},
+    {"value": "inf", "from": "ft", "to": "m"},
+    {"value": "x", "from": "ft", "to": "m"},
+    {"value": 1, "from": "ft"},
+    {"value": 1, "from": "ft", "to": "kg"}
+])
+def test_convert_bad_requests(body):
+    status, payload = request("POST", "/convert", body)
+    assert status == 400
+    assert "error" in payload
+
+# /expression
+
+def test_expression_get_and_post():
+    status, payload = request("GET", "/expression", query="q=90+km/h+to+m/s")
+    assert status == 200
+    assert payload["result"] == pytest.approx(25)
+
+    status, payload = request("POST", "/expression", {"expression": "1500 W*h -> kJ"})
+    assert status == 200
+    assert payload["result"] == pytest.approx(5400)
+
+@pytest.mark.parametrize("body", [{}, {"expression": "1 km^400 to m^400"}, {"expression": "1 kg to m"}])
+def test_expression_bad_requests(body):
+    status, payload = request("POST", "/expression", body)
+    assert status == 400
+
+# /batch
+
+def test_batch_forms():
+    status, payload = request("POST", "/batch", {"values": [1, 2], "from": "ft", "to": "in"})
+    assert (status, payload["results"]) == (200, [12, 24])
+
+    status, payload = request("POST", "/batch", {"conversions": [[1, "ft", "in"], [1000, "g", "kg"]]})
+    assert (status, payload["results"]) == (200, [12, 1])
+
+    status, payload = request("POST", "/batch", {"expressions": ["1 ft to in", "1e308 km to mm"]})
+    assert (status, payload["results"]) == (200, [12, None])
+
+@pytest.mark.parametrize("body", [
+    [1],
+    {"values": 5, "from": "ft", "to": "m"},
+    {"values": [[1, 2], [3, 4]], "from": "ft", "to": "m"},
+    {"values": ["x"], "from": "ft", "to": "m"},
+    {"values": [1], "from": 3, "to": "m"},
+    {"conversions": "x"},
+    {"conversions": [5]},
+    {"conversions": [[12, 3, "m"]]},
+    {"conversions": [[1, "ft", "kg"]]},
+    {"expressions": "1 ft to in"},
+    {"expressions": ["1 km^400 to m^400"]}
+])
+def test_batch_bad_requests(body):
+    status, payload = request("POST", "/batch", body)
+    assert status == 400
+    assert "error" in payload
+
+# Routing and /metrics
+
+def test_unknown_path_and_method():
+    assert request("GET", "/nowhere")[0] == 404
+    assert request("GET", "/batch")[0] == 405
+    assert request("POST", "/metrics")[0] == 405
+
+def test_metrics_counts_requests():
+    metrics.enabled = True
+    try:
+        metrics.reset()
+        request("GET", "/health")
+        request("GET", "/nowhere")
+        status, text = request("GET", "/metrics")
+    finally:
+        metrics.enabled = False
+        metrics.reset()
+    assert status == 200
+    assert 'unit_converter_service_requests_total{path="/health",status="200"} 1' in text
+    assert 'unit_converter_service_requests_total{path="other",status="404"} 1' in text
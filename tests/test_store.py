@@ -0,0 +1,109 @@
+# Tests for the SQLite history and favorites store
+import pytest
+
+from favorites import SessionFavorites
+from store import FavoritesStore, HistoryStore, connect, prune_profiles
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "unit_converter.db")
+
+def fill(history, rows):
+    for i in range(rows):
+        category, units = [("Length", ("Feet", "Meters")), ("Weight", ("Kilograms", "Pounds"))][i % 2]
+        history.append(category, float(i), *units, float(i), timestamp=1_700_000_000 + 600 * i)
+
+# History
+
+def test_history_persists_per_profile(path):
+    fill(HistoryStore(path, "alice"), 3)
+    assert len(HistoryStore(path, "alice")) == 3
+    assert len(HistoryStore(path, "bob")) == 0
+
+    HistoryStore(path, "bob").append("Length", 1.0, "Feet", "Meters", 0.3048)
+    HistoryStore(path, "bob").clear()
+    assert len(HistoryStore(path, "alice")) == 3
+
+def test_history_page_is_newest_first(path):
+    history = HistoryStore(path, "alice")
+    fill(history, 5)
+    assert history.page(limit=2)["value"].tolist() == [4.0, 3.0]
+    assert history.page(category="Weight")["value"].tolist() == [3.0, 1.0]
+
+def test_history_aggregates(path):
+    history = HistoryStore(path, "alice")
+    fill(history, 5)
+    assert history.category_counts() == {"Length": 3, "Weight": 2}
+    assert history.top_pairs(1) == [("Length", "Feet", "Meters", 3)]
+    assert sum(count for _, count in history.hourly_counts()) == 5
+
+def test_history_capacity_drops_oldest_rows(path):
+    history = HistoryStore(path, "alice", capacity=4)
+    fill(history, 7)
+    assert len(history) == 4
+    assert history.page()["value"].tolist() == [6.0, 5.0, 4.0, 3.0]
+    assert history.category_counts() == {"Length": 2, "Weight": 2}
+    assert sum(count for _, count in history.hourly_counts()) == 4
+
+def test_history_resize(path):
+    history = HistoryStore(path, "alice")
+    fill(history, 6)
+    history.resize(2)
+    assert history.page()["value"].tolist() == [5.0, 4.0]
+    assert history.category_counts() == {"Length": 1, "Weight": 1}
+    assert sorted(history.top_pairs()) == [("Length", "Feet", "Meters", 1), ("Weight", "Kilograms", "Pounds", 1)]
+
+# Favorites
+
+def test_favorites_persist_and_deduplicate(path):
+    favorites = FavoritesStore(path, "alice")
+    assert favorites.add("Length", 1.0, "Feet", "Meters", 0.3048)
+    assert not favorites.add("Length", 1.0, "Feet", "Meters", 0.3048)
+    assert FavoritesStore(path, "alice").contains("Length", 1.0, "Feet", "Meters")
+    assert len(FavoritesStore(path, "bob")) == 0
+
+    favorite_id = favorites.items()[0]["id"]
+    assert not FavoritesStore(path, "bob").remove(favorite_id)
+    assert favorites.remove(favorite_id)
+    assert len(favorites) == 0
+
+def test_favorites_replace_all(path):
+    favorites = FavoritesStore(path, "alice")
+    favorites.add("Length", 1.0, "Feet", "Meters", 0.3048)
+    favorites.replace_all([("Weight", 2.0, "Kilograms", "Pounds", 4.4), ("Weight", 2.0, "Kilograms", "Pounds", 4.4)])
+    assert [(f["category"], f["value"]) for f in favorites.items()] == [("Weight", 2.0)]
+
+def test_favorites_search(path):
+    favorites = FavoritesStore(path, "alice")
+    favorites.add("Length", 1.0, "Feet", "Meters", 0.3048)
+    favorites.add("Weight", 1.0, "Kilograms", "Pounds", 2.2)
+    assert [f["category"] for f in favorites.items(query="POUND")] == ["Weight"]
+    assert favorites.count(category="Length") == 1
+    assert favorites.items(offset=1, limit=1)[0]["category"] == "Weight"
+
+# Stale profiles
+
+def test_prune_profiles(path):
+    fill(HistoryStore(path, "old"), 2)
+    FavoritesStore(path, "old").add("Length", 1.0, "Feet", "Meters", 0.3048)
+    fill(HistoryStore(path, "new"), 2)
+    db, _ = connect(path)
+    db.execute("UPDATE profiles SET last_seen = 0 WHERE user = 'old'")
+
+    assert prune_profiles(path, max_age=3600) == 1
+    for table in ("history", "history_categories", "history_pairs", "history_hours", "favorites"):
+        assert db.execute(f"SELECT COUNT(*) FROM {table} WHERE user = 'old'").fetchone()[0] == 0
+    assert len(HistoryStore(path, "new")) == 2
+
+def test_empty_sessions_leave_no_profile(path):
+    HistoryStore(path, "visitor")
+    FavoritesStore(path, "visitor")
+    db, _ = connect(path)
+    assert db.execute("SELECT COUNT(*) FROM profiles").fetchone()[0] == 0
+
+@pytest.mark.parametrize("query, expected", [("%", ["50%"]), ("_", ["a_b"]), ("a_", ["a_b"]), ("\\", ["x\\y"]), ("b", ["a_b", "axb"])])
+def test_favorites_search_is_a_plain_substring_match(path, query, expected):
+    for favorites in (FavoritesStore(path, "alice"), SessionFavorites()):
+        for unit in ("50%", "a_b", "axb", "x\\y"):
+            favorites.add("Test", 1.0, unit, "Meters", 1.0)
+        assert sorted(f["from_unit"] for f in favorites.items(query=query)) == expected
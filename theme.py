@@ -0,0 +1,174 @@
+# Color themes and everything built from them: the stylesheet for each theme and
+# every icon, colored and base64-encoded, for each theme. Both are built once on
+# import; Streamlit re-executes app.py on every rerun but keeps imported modules,
+# so a rerun only looks them up.
+import base64
+
+# Define color themes with more vibrant colors
+themes = {
+    "light": {
+        "primary": "#4361EE",
+        "secondary": "#F5F5F5",
+        "text": "#333333",
+        "accent": "#F72585",
+        "background": "#FFFFFF",
+        "card": "#F9F9F9",
+        "success": "#4CAF50",
+        "info": "#3A86FF",
+        "warning": "#FFBE0B",
+        "danger": "#FF006E"
+    },
+    "dark": {
+        "primary": "#4CC9F0",
+        "secondary": "#1E1E1E",
+        "text": "#E1E1E1",
+        "accent": "#F72585",
+        "background": "#121212",
+        "card": "#1F1F1F",
+        "success": "#4CAF50",
+        "info": "#3A86FF",
+        "warning": "#FFBE0B",
+        "danger": "#FF006E"
+    }
+}
+
+# Theme color used for each icon
+ICON_COLORS = {
+    "length": "primary",
+    "weight": "accent",
+    "temperature": "danger",
+    "volume": "info",
+    "area": "success",
+    "time": "warning",
+    "speed": "primary",
+    "pressure": "info",
+    "energy": "danger",
+    "data": "success",
+    "history": "warning",
+    "favorites": "accent",
+    "settings": "primary",
+    "theme": "info"
+}
+
+# SVG icon templates, colored with str.format(color=...)
+ICON_SVGS = {
+    "length": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M2 12h20M2 12V6M22 12V6"/></svg>""",
+    "weight": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="8"/><line x1="12" y1="8" x2="12" y2="12"/><line x1="12" y1="16" x2="12" y2="16"/></svg>""",
+    "temperature": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M14 14.76V3.5a2.5 2.5 0 0 0-5 0v11.26a4.5 4.5 0 1 0 5 0z"/></svg>""",
+    "volume": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M2 9l10-5 10 5v6l-10 5-10-5V9z"/><path d="M12 14v4"/><path d="M2 9l10 5 10-5"/></svg>""",
+    "area": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="3" y="3" width="18" height="18" rx="2" ry="2"/></svg>""",
+    "time": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="10"/><polyline points="12 6 12 12 16 14"/></svg>""",
+    "speed": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M19 5L5 19"/><circle cx="6.5" cy="6.5" r="2.5"/><circle cx="17.5" cy="17.5" r="2.5"/></svg>""",
+    "pressure": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M12 2v20M2 12h20"/><path d="M12 22a10 10 0 0 0 0-20"/></svg>""",
+    "energy": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M13 2L3 14h9l-1 8 10-12h-9l1-8z"/></svg>""",
+    "data": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><rect x="2" y="2" width="20" height="8" rx="2" ry="2"/><rect x="2" y="14" width="20" height="8" rx="2" ry="2"/><line x1="6" y1="6" x2="6" y2="6"/><line x1="6" y1="18" x2="6" y2="18"/></svg>""",
+    "history": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M3 3v18h18"/><path d="M19 9l-5 5-4-4-3 3"/></svg>""",
+    "favorites": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="{color}" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M19 21l-7-5-7 5V5a2 2 0 0 1 2-2h10a2 2 0 0 1 2 2z"/></svg>""",
+    "settings": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="none" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><circle cx="12" cy="12" r="3"/><path d="M19.4 15a1.65 1.65 0 0 0 .33 1.82l.06.06a2 2 0 0 1 0 2.83 2 2 0 0 1-2.83 0l-.06-.06a1.65 1.65 0 0 0-1.82-.33 1.65 1.65 0 0 0-1 1.51V21a2 2 0 0 1-2 2 2 2 0 0 1-2-2v-.09A1.65 1.65 0 0 0 9 19.4a1.65 1.65 0 0 0-1.82.33l-.06.06a2 2 0 0 1-2.83 0 2 2 0 0 1 0-2.83l.06-.06a1.65 1.65 0 0 0 .33-1.82 1.65 1.65 0 0 0-1.51-1H3a2 2 0 0 1-2-2 2 2 0 0 1 2-2h.09A1.65 1.65 0 0 0 4.6 9a1.65 1.65 0 0 0-.33-1.82l-.06-.06a2 2 0 0 1 0-2.83 2 2 0 0 1 2.83 0l.06.06a1.65 1.65 0 0 0 1.82.33H9a1.65 1.65 0 0 0 1-1.51V3a2 2 0 0 1 2-2 2 2 0 0 1 2 2v.09a1.65 1.65 0 0 0 1 1.51 1.65 1.65 0 0 0 1.82-.33l.06-.06a2 2 0 0 1 2.83 0 2 2 0 0 1 0 2.83l-.06.06a1.65 1.65 0 0 0-.33 1.82V9a1.65 1.65 0 0 0 1.51 1H21a2 2 0 0 1 2 2 2 2 0 0 1-2 2h-.09a1.65 1.65 0 0 0-1.51 1z"/></svg>""",
+    "theme": """<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="{color}" stroke="{color}" stroke-width="2" stroke-linecap="round" stroke-linejoin="round"><path d="M21 12.79A9 9 0 1 1 11.21 3 7 7 0 0 0 21 12.79z"/></svg>"""
+}
+
+# Stylesheet for a theme
+def theme_css(theme_name):
+    theme = themes[theme_name]
+
+    return f"""
+    <style>
+        :root {{
+            --primary: {theme["primary"]};
+            --secondary: {theme["secondary"]};
+            --text: {theme["text"]};
+            --accent: {theme["accent"]};
+            --background: {theme["background"]};
+            --card: {theme["card"]};
+        }}
+        
+        .stApp {{
+            background-color: var(--background);
+            color: var(--text);
+        }}
+        
+        .stButton>button {{
+            background-color: var(--primary);
+            color: white;
+            border-radius: 8px;
+            border: none;
+            padding: 0.5rem 1rem;
+            transition: all 0.3s ease;
+        }}
+        
+        .stButton>button:hover {{
+            background-color: var(--accent);
+            transform: translateY(-2px);
+            box-shadow: 0 4px 8px rgba(0,0,0,0.1);
+        }}
+        
+        .card {{
+            background-color: var(--card);
+            border-radius: 10px;
+            padding: 1.5rem;
+            box-shadow: 0 4px 6px rgba(0,0,0,0.05);
+            margin-bottom: 1rem;
+            border: 1px solid rgba(0,0,0,0.05);
+        }}
+        
+        .icon-text {{
+            display: flex;
+            align-items: center;
+            gap: 0.5rem;
+        }}
+        
+        .result-card {{
+            background-color: var(--primary);
+            color: white;
+            border-radius: 10px;
+            padding: 1rem;
+            text-align: center;
+            font-size: 1.5rem;
+            margin: 1rem 0;
+            box-shadow: 0 4px 10px rgba(0,0,0,0.1);
+        }}
+        
+        .sidebar .sidebar-content {{
+            background-color: var(--secondary);
+        }}
+        
+        h1, h2, h3 {{
+            color: var(--primary);
+        }}
+        
+        .stSelectbox label, .stNumberInput label {{
+            color: var(--text);
+        }}
+        
+        .theme-toggle {{
+            position: fixed;
+            top: 1rem;
+            right: 1rem;
+            z-index: 1000;
+        }}
+        
+        /* Responsive adjustments */
+        @media (max-width: 768px) {{
+            .card {{
+                padding: 1rem;
+            }}
+            
+            .result-card {{
+                font-size: 1.2rem;
+            }}
+        }}
+    </style>
+    """
+
+# Built once per process, read by every rerun
+THEME_CSS = {name: theme_css(name) for name in themes}
+
+# Base64 SVG for each icon in each theme's colors
+THEME_ICONS = {
+    name: {
+        icon: base64.b64encode(svg.format(color=colors[ICON_COLORS.get(icon, "primary")]).encode()).decode()
+        for icon, svg in ICON_SVGS.items()
+    }
+    for name, colors in themes.items()
+}
@@ -0,0 +1,157 @@
+# Command-line entry point for the conversion core:
+#
+#   unit-convert 12 Feet Meters
+#   unit-convert 12 ft m --category Length
+#   seq 1 1000000 | unit-convert --from Feet --to Meters      (one value per line)
+#   unit-convert < jobs.tsv                                   (value<TAB>from<TAB>to per line)
+#   unit-convert --exact -p 4 1 mi ft                         (exact arithmetic, 4 decimal places)
+#   unit-convert 3.2 mi to km                                 (free-text request)
+#   unit-convert "1500 W*h -> kJ"                             ("->" and "=>" work like "to"; quote them,
+#                                                             or the shell reads ">" as a redirect)
+#   unit-convert 1 kWh/m² J/cm²                               (compound units)
+#
+# Only the conversion core is imported, so the command starts without loading
+# Streamlit, Plotly or pandas.
+import argparse
+import sys
+
+from converter import UNIT_REGISTRY, convert, convert_array, convert_exact, exact_decimal, resolve_pair
+from dimensions import conversion_plan
+from expressions import compile_request
+
+# Number of stdin lines converted per vectorized batch in --from/--to mode
+CHUNK_LINES = 65536
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="unit-convert",
+        description="Convert values between units. With no VALUE, read conversions from stdin."
+    )
+    parser.add_argument("value", nargs="?", help="value to convert, or a whole request such as \"3.2 mi to km\"")
+    parser.add_argument("units", nargs="*", metavar="UNIT", help="from unit and to unit (or the rest of the request)")
+    parser.add_argument("--from", dest="from_unit", help="from unit for stdin values")
+    parser.add_argument("--to", dest="to_unit", help="to unit for stdin values")
+    parser.add_argument("-c", "--category", choices=list(UNIT_REGISTRY),
+                        help="unit category (inferred from the units when omitted)")
+    parser.add_argument("-p", "--precision", type=int, default=8,
+                        help="significant digits in the output, decimal places with --exact (default: 8)")
+    parser.add_argument("--exact", action="store_true",
+                        help="convert with exact rational factors instead of float64")
+    return parser
+
+# Conversion functions (scalar, array, exact) for a unit pair: registry units first,
+# so --category applies, else any compound unit expression the dimensions engine
+# can compile ("kWh/m²", "km/h")
+def resolve_conversion(category, from_name, to_name):
+    try:
+        category, from_unit, to_unit = resolve_pair(category, from_name, to_name)
+    except KeyError:
+        if category is not None:
+            raise
+        plan = conversion_plan(from_name, to_name)
+        return plan.convert, plan.convert_array, plan.convert_exact
+
+    return (
+        lambda value: convert(category, value, from_unit, to_unit),
+        lambda values: convert_array(category, values, from_unit, to_unit),
+        lambda text: convert_exact(category, text, from_unit, to_unit)
+    )
+
+# One value, formatted: float64 to `precision` significant digits, or exactly
+# (from the value's decimal text) rounded to `precision` decimal places
+def convert_one(conversion, text, precision, exact=False):
+    if exact:
+        return f"{exact_decimal(conversion[2](text), precision):f}"
+    return f"{conversion[0](float(text)):.{precision}g}"
+
+# Stdin with --from/--to: every line is a value, converted in vectorized chunks
+def convert_value_stream(lines, output, conversion, precision, exact=False):
+    if exact:
+        # No vectorized exact path: one Fraction conversion per line
+        for line in lines:
+            line = line.strip()
+            if line:
+                output.write(convert_one(conversion, line, precision, exact=True) + "\n")
+        return
+
+    chunk = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            chunk.append(float(line))
+        if len(chunk) >= CHUNK_LINES:
+            _write_values(output, conversion[1](chunk), precision)
+            chunk = []
+    if chunk:
+        _write_values(output, conversion[1](chunk), precision)
+
+def _write_values(output, values, precision):
+    output.write("".join(f"{value:.{precision}g}\n" for value in values.tolist()))
+
+# Stdin without --from/--to: every line is "value<TAB>from<TAB>to" (commas or plain
+# whitespace also work when the unit names have no spaces), or a free-text request
+# such as "3.2 mi to km". Returns the error count.
+def convert_line_stream(lines, output, category, precision, exact=False):
+    pairs = {}
+    errors = 0
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            if "\t" in line:
+                fields = line.split("\t")
+            elif "," in line:
+                fields = line.split(",")
+            else:
+                fields = line.split()
+            if len(fields) == 3:
+                value, from_name, to_name = fields[0].strip(), fields[1].strip(), fields[2].strip()
+                if (from_name, to_name) not in pairs:
+                    pairs[from_name, to_name] = resolve_conversion(category, from_name, to_name)
+                conversion = pairs[from_name, to_name]
+            else:
+                value, plan = compile_request(line)
+                conversion = (plan.convert, plan.convert_array, plan.convert_exact)
+
+            output.write(convert_one(conversion, value, precision, exact) + "\n")
+        except (KeyError, ValueError, OverflowError) as e:
+            errors += 1
+            print(f"unit-convert: line {line_number}: {_message(e)}", file=sys.stderr)
+    return errors
+
+# KeyError wraps its message in quotes when formatted, so unwrap it
+def _message(error):
+    return error.args[0] if error.args else error
+
+def main(argv=None):
+    parser = build_parser()
+    # argparse would read a bare "->" as an option, so it is passed on as "to"
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(["to" if arg == "->" else arg for arg in argv])
+
+    try:
+        if args.value is not None:
+            if len(args.units) == 2:
+                value, conversion = args.value, resolve_conversion(args.category, *args.units)
+            else:
+                value, plan = compile_request(" ".join([args.value, *args.units]))
+                conversion = (plan.convert, plan.convert_array, plan.convert_exact)
+            print(convert_one(conversion, value, args.precision, args.exact))
+            return 0
+
+        if args.from_unit or args.to_unit:
+            if not (args.from_unit and args.to_unit):
+                parser.error("--from and --to must be given together")
+            conversion = resolve_conversion(args.category, args.from_unit, args.to_unit)
+            convert_value_stream(sys.stdin, sys.stdout, conversion, args.precision, args.exact)
+            return 0
+    except (KeyError, ValueError, OverflowError) as e:
+        print(f"unit-convert: {_message(e)}", file=sys.stderr)
+        return 1
+
+    return 1 if convert_line_stream(sys.stdin, sys.stdout, args.category, args.precision, args.exact) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())